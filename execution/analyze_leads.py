@@ -1,10 +1,20 @@
 import sys
 import json
+import argparse
+import sheet_mirror
 
-def analyze_leads(leads_file, target_industry):
+def analyze_leads(leads_file, target_industry, from_mirror=False):
     try:
-        with open(leads_file, "r") as f:
-            leads = json.load(f)
+        if from_mirror:
+            # `leads_file` names a mirrored tab; nothing goes over the network
+            conn = sheet_mirror.open_mirror()
+            leads = sheet_mirror.find_rows(conn, leads_file)
+            conn.close()
+            for lead in leads:
+                del lead['_row_number']
+        else:
+            with open(leads_file, "r") as f:
+                leads = json.load(f)
             
         if not leads:
             print("No leads to analyze.")
@@ -35,14 +45,14 @@ def analyze_leads(leads_file, target_industry):
         sys.exit(1)
 
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: python analyze_leads.py <leads_json_file> <target_industry>")
-        sys.exit(1)
-        
-    leads_file = sys.argv[1]
-    target_industry = sys.argv[2]
+    parser = argparse.ArgumentParser(description="Score how relevant a batch of leads is to a target industry")
+    parser.add_argument("leads_file", help="JSON file of leads, or a tab name with --from-mirror")
+    parser.add_argument("target_industry", help="Industry keyword to look for")
+    parser.add_argument("--from-mirror", action="store_true", help="Analyze a tab from the local mirror (see sheet_mirror.py)")
+    
+    args = parser.parse_args()
     
-    analyze_leads(leads_file, target_industry)
+    analyze_leads(args.leads_file, args.target_industry, args.from_mirror)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,121 @@
+"""
+Batched, asynchronous Outscraper emails_and_contacts lookups.
+
+Calling client.emails_and_contacts([website]) per lead costs a full
+submit-and-wait round trip each time (the SDK polls every 5 seconds). Here
+websites are deduplicated by normalized domain, submitted in batches as async
+Outscraper requests, and all outstanding requests are polled concurrently.
+Results come back keyed by normalized domain so callers can map them onto
+their rows. With an enrichment cache, fresh cached domains (including cached
+dead ends) are answered locally and only the rest are sent to Outscraper.
+"""
+
+import asyncio
+
+from domains import normalize_domain
+import enrichment_cache
+import outscraper_requests
+
+DEFAULT_BATCH_SIZE = 25
+DEFAULT_CONCURRENCY = 4
+
+def submit_batch(client, websites):
+    """Queue one async emails_and_contacts request and return its request id."""
+    # The SDK's public method blocks until the result is ready; its transport can
+    # return the queued request instead, which is what lets batches overlap
+    response = client._request('GET', '/emails-and-contacts', wait_async=True, async_request=True,
+                               params={'query': websites, 'async': True})
+    return response['id']
+
+def result_domain(item):
+    for key in ('query', 'domain', 'site', 'website'):
+        if item.get(key):
+            return normalize_domain(item[key])
+    return ''
+
+def index_results(data):
+    """Archive data -> {domain: website_data}. Items may be nested one list deep per query."""
+    found = {}
+    for entry in data or []:
+        for item in (entry if isinstance(entry, list) else [entry]):
+            if isinstance(item, dict):
+                domain = result_domain(item)
+                if domain and domain not in found:
+                    found[domain] = item
+    return found
+
+async def run_batch(client, websites, semaphore, progress):
+    """Submit one batch and poll it until done. Returns (found, errors) keyed by domain."""
+    domains = [normalize_domain(website) for website in websites]
+    async with semaphore:
+        try:
+            request_id = await asyncio.to_thread(submit_batch, client, websites)
+            archive = await outscraper_requests.poll_request(client, request_id)
+        except Exception as e:
+            progress['done'] += len(websites)
+            print(f"  ❌ Batch of {len(websites)} failed: {e}")
+            return {}, {domain: str(e) for domain in domains}
+
+    found = index_results(archive.get('data'))
+    progress['done'] += len(websites)
+    print(f"  📦 {progress['done']}/{progress['total']} websites looked up ({len(found)} with results in this batch)")
+    return found, {}
+
+def lookup_cached(cache, domains, ttl_days, negative_ttl_days):
+    """Split domains into cached results and the ones still to look up."""
+    found, pending = {}, []
+    for domain in domains:
+        entry = enrichment_cache.get_entry(cache, domain, ttl_days, negative_ttl_days)
+        if entry is None:
+            pending.append(domain)
+        elif entry['status'] != enrichment_cache.NO_RESULTS:
+            found[domain] = {'query': domain, 'emails': entry['contacts']}
+    return found, pending
+
+async def fetch_contacts_async(client, websites, batch_size=DEFAULT_BATCH_SIZE, concurrency=DEFAULT_CONCURRENCY,
+                               cache=None, ttl_days=enrichment_cache.DEFAULT_TTL_DAYS,
+                               negative_ttl_days=enrichment_cache.DEFAULT_NEGATIVE_TTL_DAYS, refresh=False):
+    # One query per domain, whatever URL variants the leads use
+    unique = {}
+    for website in websites:
+        domain = normalize_domain(website)
+        if domain and domain not in unique:
+            unique[domain] = website.strip()
+
+    found, pending = {}, list(unique)
+    if cache is not None and not refresh:
+        found, pending = lookup_cached(cache, pending, ttl_days, negative_ttl_days)
+        print(f"Enrichment cache: {len(unique) - len(pending)} of {len(unique)} websites already looked up")
+    queries = [unique[domain] for domain in pending]
+    if not queries:
+        return found, {}
+
+    batches = [queries[i:i + batch_size] for i in range(0, len(queries), batch_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+    progress = {'done': 0, 'total': len(queries)}
+    print(f"Looking up {len(queries)} websites in {len(batches)} batch(es) of up to {batch_size}...")
+
+    errors = {}
+    results = await asyncio.gather(*(run_batch(client, batch, semaphore, progress) for batch in batches))
+    for batch, (batch_found, batch_errors) in zip(batches, results):
+        found.update(batch_found)
+        errors.update(batch_errors)
+        if cache is not None and not batch_errors:
+            # Only a batch whose request succeeded is cached, negative results included
+            for website in batch:
+                domain = normalize_domain(website)
+                enrichment_cache.put_result(cache, domain, batch_found.get(domain))
+    return found, errors
+
+def fetch_contacts(client, websites, batch_size=DEFAULT_BATCH_SIZE, concurrency=DEFAULT_CONCURRENCY,
+                   cache=None, ttl_days=enrichment_cache.DEFAULT_TTL_DAYS,
+                   negative_ttl_days=enrichment_cache.DEFAULT_NEGATIVE_TTL_DAYS, refresh=False):
+    """Look up emails and contacts for `websites`.
+
+    Returns (found, errors): {domain: website_data} for domains with a result
+    and {domain: error message} for domains whose batch failed. Domains in
+    neither had no results. `cache` (see enrichment_cache) is consulted
+    first unless `refresh`, and updated with what was fetched.
+    """
+    return asyncio.run(fetch_contacts_async(client, websites, batch_size, concurrency,
+                                            cache, ttl_days, negative_ttl_days, refresh))
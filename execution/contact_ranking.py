@@ -0,0 +1,58 @@
+"""
+Rank scraped contacts by how likely they are to be a decision maker.
+
+Title keywords are weighted by seniority (owner > CEO > VP > director >
+manager) and compiled into a single regex with one named group per tier, so
+each contact's title and level are scanned once and scored by the most senior
+tier they mention. Contacts with a title but no keyword come next, then the
+rest; ties keep the scraped order. Selecting the top k of a site with
+hundreds of emails is one pass plus a heap.
+"""
+
+import re
+import heapq
+
+# (tier, weight, title patterns); matched on word boundaries, case-insensitively
+TITLE_TIERS = [
+    ('owner', 50, [r'owner', r'founder', r'co-?founder', r'principal', r'proprietor']),
+    ('chief', 40, [r'ceo', r'chief \w+ officer', r'c[oft]o', r'president', r'executive director', r'administrator']),
+    ('vp', 30, [r'vp', r'svp', r'evp', r'vice president']),
+    ('director', 20, [r'director', r'head of']),
+    ('manager', 10, [r'manager', r'supervisor', r'coordinator']),
+]
+TITLED_SCORE = 1
+
+TIER_WEIGHTS = {tier: weight for tier, weight, _ in TITLE_TIERS}
+TITLE_PATTERN = re.compile(
+    '|'.join(rf"(?P<{tier}>\b(?:{'|'.join(patterns)})\b)" for tier, _, patterns in TITLE_TIERS),
+    re.IGNORECASE,
+)
+
+def score_contact(contact):
+    """Seniority score of one contact (0 for contacts that aren't dicts or have no title)."""
+    if not isinstance(contact, dict):
+        return 0
+    title = contact.get('title') or ''
+    text = f"{title} {contact.get('level') or ''}"
+    best = max((TIER_WEIGHTS[match.lastgroup] for match in TITLE_PATTERN.finditer(text)), default=0)
+    if best:
+        return best
+    return TITLED_SCORE if title.strip() else 0
+
+def rank_contacts(contacts, k=None):
+    """Return the `k` best contacts (all if None), most senior first.
+
+    Non-dict entries are dropped; equal scores keep their original order.
+    """
+    scored = [(score_contact(contact), -index, contact)
+              for index, contact in enumerate(contacts or []) if isinstance(contact, dict)]
+    if k is None:
+        scored.sort(key=lambda item: item[:2], reverse=True)
+    else:
+        scored = heapq.nlargest(k, scored, key=lambda item: item[:2])
+    return [contact for _, _, contact in scored]
+
+def pick_decision_maker(contacts):
+    """The single best contact, or None if there is no usable one."""
+    ranked = rank_contacts(contacts, k=1)
+    return ranked[0] if ranked else None
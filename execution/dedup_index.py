@@ -0,0 +1,100 @@
+"""
+Persistent dedup index of the websites already in a sheet tab.
+
+filter_and_score used to download every column of every row just to learn
+which websites were already uploaded. The normalized domains are kept in a
+local SQLite table instead, tagged with the spreadsheet's Drive version. When
+the version hasn't moved since the index was last reconciled the sheet is not
+read at all; otherwise only the Website column is read. Checking new leads is
+then one indexed lookup each, independent of the size of the tab.
+"""
+
+import os
+import sqlite3
+
+from domains import normalize_domain
+
+INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", os.path.join(".cache", "dedup_index.sqlite"))
+WEBSITE_HEADER = "Website"
+
+def open_index(path=INDEX_PATH):
+    """Open (creating if needed) the index database."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS domains (
+            spreadsheet_id TEXT NOT NULL,
+            sheet TEXT NOT NULL,
+            domain TEXT NOT NULL,
+            PRIMARY KEY (spreadsheet_id, sheet, domain)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS revisions (
+            spreadsheet_id TEXT NOT NULL,
+            sheet TEXT NOT NULL,
+            version TEXT NOT NULL,
+            PRIMARY KEY (spreadsheet_id, sheet)
+        )
+    """)
+    return conn
+
+def indexed_version(conn, spreadsheet_id, sheet):
+    row = conn.execute(
+        "SELECT version FROM revisions WHERE spreadsheet_id = ? AND sheet = ?",
+        (spreadsheet_id, sheet)
+    ).fetchone()
+    return row[0] if row else None
+
+def set_version(conn, spreadsheet_id, sheet, version):
+    conn.execute(
+        "INSERT OR REPLACE INTO revisions (spreadsheet_id, sheet, version) VALUES (?, ?, ?)",
+        (spreadsheet_id, sheet, str(version))
+    )
+
+def read_website_column(worksheet, header=WEBSITE_HEADER):
+    """Website values of a gspread worksheet, reading the header row and that one column only."""
+    headers = [str(h).strip().lower() for h in worksheet.row_values(1)]
+    if header.lower() not in headers:
+        return []
+    return worksheet.col_values(headers.index(header.lower()) + 1)[1:]
+
+def reconcile(conn, worksheet, spreadsheet_id, sheet, version):
+    """Bring the index for `sheet` up to date with the tab at Drive `version`.
+
+    Returns True if the tab had to be read, False if the index was current.
+    """
+    if version is not None and indexed_version(conn, spreadsheet_id, sheet) == str(version):
+        return False
+
+    domains = {normalize_domain(website) for website in read_website_column(worksheet)}
+    domains.discard('')
+    # Rebuild rather than merge, so rows deleted from the tab can be uploaded again
+    conn.execute("DELETE FROM domains WHERE spreadsheet_id = ? AND sheet = ?", (spreadsheet_id, sheet))
+    conn.executemany(
+        "INSERT OR IGNORE INTO domains (spreadsheet_id, sheet, domain) VALUES (?, ?, ?)",
+        [(spreadsheet_id, sheet, domain) for domain in domains]
+    )
+    if version is not None:
+        set_version(conn, spreadsheet_id, sheet, version)
+    conn.commit()
+    print(f"Dedup index rebuilt from '{sheet}': {len(domains)} websites")
+    return True
+
+def contains(conn, spreadsheet_id, sheet, domain):
+    return conn.execute(
+        "SELECT 1 FROM domains WHERE spreadsheet_id = ? AND sheet = ? AND domain = ?",
+        (spreadsheet_id, sheet, domain)
+    ).fetchone() is not None
+
+def add_domains(conn, spreadsheet_id, sheet, domains, version=None):
+    """Record domains just uploaded, plus the Drive version the upload produced."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO domains (spreadsheet_id, sheet, domain) VALUES (?, ?, ?)",
+        [(spreadsheet_id, sheet, domain) for domain in domains if domain]
+    )
+    if version is not None:
+        set_version(conn, spreadsheet_id, sheet, version)
+    conn.commit()
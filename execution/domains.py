@@ -0,0 +1,32 @@
+"""
+Domain helpers shared by the lead scripts.
+"""
+
+from urllib.parse import urlsplit
+
+def normalize_domain(url):
+    """Reduce a website value to a bare host: 'https://WWW.Example.com/about' -> 'example.com'."""
+    if not url:
+        return ''
+    url = str(url).strip().lower()
+    if '://' not in url:
+        url = 'http://' + url
+    try:
+        host = urlsplit(url).hostname or ''
+    except ValueError:
+        return ''
+    if host.startswith('www.'):
+        host = host[4:]
+    return host.rstrip('.')
+
+def hostname(url):
+    """Host to resolve for a website value, keeping any 'www.': 'Example.com/about' -> 'example.com'."""
+    if not url:
+        return ''
+    url = str(url).strip()
+    if '://' not in url:
+        url = 'http://' + url
+    try:
+        return (urlsplit(url).hostname or '').rstrip('.')
+    except ValueError:
+        return ''
@@ -7,68 +7,66 @@ Reads from "Qualified Leads" sheet, enriches with decision maker emails/names, a
 import os
 import sys
 import json
+import argparse
 from datetime import datetime
 from dotenv import load_dotenv
 from outscraper import ApiClient
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from sheets_client import SPREADSHEET_ID, require_config, get_sheets
+import range_planner
+import sheet_reader
+import sheet_mirror
+import contact_enricher
+import enrichment_cache
+import contact_ranking
+from domains import normalize_domain
 
 load_dotenv()
 
 # Configuration
 OUTSCRAPER_API_KEY = os.getenv("OUTSCRAPER_API_KEY")
-SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
-CREDENTIALS_FILE = os.getenv("GOOGLE_SHEETS_CREDENTIALS_JSON")
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 
 SHEET_NAME = "Qualified Leads"
 OUTPUT_DIR = "output"
+# Only these columns are read; 'Name', 'Email ' and 'Title' are the B:D contact cells written back
+READ_COLUMNS = ['Name', 'Email ', 'Title', 'Website', 'Lead_Score']
 
-def get_hot_leads(limit=10):
-    """Read hot leads from Google Sheets"""
-    if not SPREADSHEET_ID or not CREDENTIALS_FILE:
-        raise ValueError("GOOGLE_SPREADSHEET_ID or GOOGLE_SHEETS_CREDENTIALS_JSON not set in .env")
+def is_hot_lead(row):
+    return row.get('Lead_Score', '').upper() == 'HOT LEAD'
+
+def get_hot_leads(limit=10, from_mirror=False):
+    """Read hot leads from Google Sheets (or from the local mirror)"""
+    require_config()
     
-    creds = service_account.Credentials.from_service_account_file(
-        CREDENTIALS_FILE, scopes=SCOPES)
-    service = build('sheets', 'v4', credentials=creds)
-    sheet = service.spreadsheets()
+    if from_mirror:
+        # Refresh only if the spreadsheet changed, so row numbers are safe to write back to
+        conn = sheet_mirror.open_mirror()
+        sheet_mirror.sync_tabs(conn, [SHEET_NAME])
+        header = sheet_mirror.read_header(conn, SHEET_NAME)
+        hot_leads = sheet_mirror.find_rows(conn, SHEET_NAME, READ_COLUMNS, predicate=is_hot_lead, limit=limit) if header else []
+        conn.close()
+        print(f"Found {len(hot_leads)} HOT LEADS")
+        return hot_leads, header
     
-    # Read all data from the sheet
-    result = sheet.values().get(
-        spreadsheetId=SPREADSHEET_ID,
-        range=f"'{SHEET_NAME}'!A:L"
-    ).execute()
+    sheet = get_sheets()
     
-    values = result.get('values', [])
-    if not values:
+    # Header and row count first, then just the needed columns, window by window
+    layout = sheet_reader.read_layout(sheet, SPREADSHEET_ID, SHEET_NAME)
+    header = layout[0]
+    if not header:
         print("No data found in sheet")
-        return []
-    
-    # Parse header
-    header = values[0]
+        return [], []
     
-    # Find HOT LEADS
-    hot_leads = []
-    for i, row in enumerate(values[1:], start=2):  # Start at row 2 (1-indexed)
-        # Pad row to match header length
-        while len(row) < len(header):
-            row.append('')
-        
-        row_dict = dict(zip(header, row))
-        
-        # Check if it's a HOT LEAD
-        if row_dict.get('Lead_Score', '').upper() == 'HOT LEAD':
-            row_dict['_row_number'] = i  # Store row number for later update
-            hot_leads.append(row_dict)
-            
-            if len(hot_leads) >= limit:
-                break
+    # Stops reading as soon as `limit` HOT LEADS are found
+    hot_leads = sheet_reader.find_rows(
+        sheet, SPREADSHEET_ID, SHEET_NAME, READ_COLUMNS,
+        predicate=is_hot_lead,
+        limit=limit, layout=layout)
     
     print(f"Found {len(hot_leads)} HOT LEADS")
     return hot_leads, header
 
-def enrich_with_outscraper(leads):
+def enrich_with_outscraper(leads, batch_size=contact_enricher.DEFAULT_BATCH_SIZE, concurrency=contact_enricher.DEFAULT_CONCURRENCY,
+                           refresh=False, ttl_days=enrichment_cache.DEFAULT_TTL_DAYS):
     """Use Outscraper to find decision maker emails from company websites"""
     if not OUTSCRAPER_API_KEY:
         raise ValueError("OUTSCRAPER_API_KEY not set in .env")
@@ -78,6 +76,13 @@ def enrich_with_outscraper(leads):
     
     print(f"\nEnriching {len(leads)} leads with Outscraper...")
     
+    # All websites are looked up up-front in async batches, then mapped back by domain;
+    # domains looked up recently are answered from the enrichment cache
+    cache = enrichment_cache.open_cache()
+    websites = [lead.get('Website', '').strip() for lead in leads if lead.get('Website', '').strip()]
+    found, errors = contact_enricher.fetch_contacts(client, websites, batch_size, concurrency,
+                                                    cache=cache, ttl_days=ttl_days, refresh=refresh)
+    
     for i, lead in enumerate(leads, 1):
         website = lead.get('Website', '').strip()
         company_name = lead.get('Name', 'Unknown')
@@ -94,13 +99,12 @@ def enrich_with_outscraper(leads):
             continue
         
         try:
-            # Use Outscraper Emails and Contacts Scraper
-            # This scrapes emails from the website
-            print(f"  🔍 Scraping {website}...")
-            results = client.emails_and_contacts([website])
-
+            domain = normalize_domain(website)
+            if domain in errors:
+                raise Exception(errors[domain])
+            website_data = found.get(domain)
             
-            if not results or len(results) == 0:
+            if not website_data:
                 print(f"  ⚠️  No results found")
                 enriched_leads.append({
                     **lead,
@@ -109,8 +113,6 @@ def enrich_with_outscraper(leads):
                 })
                 continue
             
-            # Get the first result (website data)
-            website_data = results[0]
             
             # Extract emails and names
             emails = website_data.get('emails', [])
@@ -124,35 +126,10 @@ def enrich_with_outscraper(leads):
                 })
                 continue
             
-            # Try to find decision maker email (look for VP, Director, CEO, President, etc.)
-            decision_maker_keywords = ['vp', 'vice president', 'director', 'executive', 'ceo', 'president', 'owner', 'manager']
-            decision_maker_contact = None
-            
-            # First, try to find a contact with a decision maker title
-            for contact in emails:
-                if isinstance(contact, dict):
-                    title = contact.get('title', '').lower()
-                    level = contact.get('level', '').lower()
-                    
-                    # Check if title or level contains decision maker keywords
-                    for keyword in decision_maker_keywords:
-                        if keyword in title or keyword in level:
-                            decision_maker_contact = contact
-                            break
-                    
-                    if decision_maker_contact:
-                        break
-            
-            # If no decision maker found, use the first contact with a title
-            if not decision_maker_contact:
-                for contact in emails:
-                    if isinstance(contact, dict) and contact.get('title'):
-                        decision_maker_contact = contact
-                        break
+            # Most senior contact by title/level; falls back to any titled contact, then the first
+            decision_maker_contact = contact_ranking.pick_decision_maker(emails)
             
-            # If still no contact found, use the first email
-            if not decision_maker_contact:
-                decision_maker_contact = emails[0] if emails else None
+            enrichment_cache.put_decision_maker(cache, website, decision_maker_contact)
             
             # Extract email, name, and title
             if decision_maker_contact and isinstance(decision_maker_contact, dict):
@@ -167,7 +144,7 @@ def enrich_with_outscraper(leads):
                     'Name': full_name,  # Update the Name column with decision maker name
                     'Email ': email,
                     'Title': title.title(),  # Capitalize title
-                    '_all_contacts': emails[:5]  # Store first 5 contacts for reference
+                    '_all_contacts': contact_ranking.rank_contacts(emails, k=5)  # Top 5 ranked contacts for reference
                 })
             else:
                 print(f"  ⚠️  No valid contact found")
@@ -186,60 +163,35 @@ def enrich_with_outscraper(leads):
                 'Title': 'N/A'
             })
     
+    cache.close()
     return enriched_leads
 
 def update_google_sheet(enriched_leads, header):
     """Update the Google Sheet with enriched data"""
-    if not SPREADSHEET_ID or not CREDENTIALS_FILE:
-        raise ValueError("GOOGLE_SPREADSHEET_ID or GOOGLE_SHEETS_CREDENTIALS_JSON not set in .env")
+    require_config()
     
-    creds = service_account.Credentials.from_service_account_file(
-        CREDENTIALS_FILE, scopes=SCOPES)
-    service = build('sheets', 'v4', credentials=creds)
-    sheet = service.spreadsheets()
+    sheet = get_sheets()
     
     # Find column indices for Email and Title
     # Note: There are two "Name" columns. The first is Business Name (A), the second is Contact Name (B).
     # We'll assume the structure is fixed as: Name, Name, Email, Title...
     
-    contact_name_col = 'B'
-    email_col = 'C'
-    title_col = 'D'
+    contact_name_col = 1  # B
+    email_col = 2  # C
+    title_col = 3  # D
     
     print(f"\nUpdating Google Sheet...")
-    print(f"Name column: {contact_name_col}, Email column: {email_col}, Title column: {title_col}")
+    print(f"Name column: B, Email column: C, Title column: D")
     
-    # Prepare batch update
-    updates = []
+    # Collect per-cell edits; the planner merges them into B:D blocks across consecutive rows
+    edits = {}
     for lead in enriched_leads:
         row_num = lead['_row_number']
-        name = lead.get('Name', '')
-        email = lead.get('Email ', '')
-        title = lead.get('Title', '')
-        
-        updates.append({
-            'range': f"'{SHEET_NAME}'!{contact_name_col}{row_num}",
-            'values': [[name]]
-        })
-        updates.append({
-            'range': f"'{SHEET_NAME}'!{email_col}{row_num}",
-            'values': [[email]]
-        })
-        updates.append({
-            'range': f"'{SHEET_NAME}'!{title_col}{row_num}",
-            'values': [[title]]
-        })
-    
-    # Execute batch update
-    body = {
-        'valueInputOption': 'RAW',
-        'data': updates
-    }
+        edits[(row_num, contact_name_col)] = lead.get('Name', '')
+        edits[(row_num, email_col)] = lead.get('Email ', '')
+        edits[(row_num, title_col)] = lead.get('Title', '')
     
-    result = sheet.values().batchUpdate(
-        spreadsheetId=SPREADSHEET_ID,
-        body=body
-    ).execute()
+    result = range_planner.write_edits(sheet, SPREADSHEET_ID, SHEET_NAME, edits)
     
     print(f"✅ Updated {len(enriched_leads)} rows in Google Sheet")
     
@@ -258,22 +210,30 @@ def save_results(enriched_leads):
     return output_file
 
 def main():
-    limit = 10
-    if len(sys.argv) > 1:
-        limit = int(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Enrich HOT LEADS in the Qualified Leads sheet with decision maker info")
+    parser.add_argument("limit", nargs="?", type=int, default=10, help="Number of HOT LEADS to enrich (default: 10)")
+    parser.add_argument("--from-mirror", action="store_true", help="Select leads from the local mirror (re-pulled first only if the sheet changed)")
+    parser.add_argument("--batch-size", type=int, default=contact_enricher.DEFAULT_BATCH_SIZE, help=f"Websites per Outscraper request (default: {contact_enricher.DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--lookup-concurrency", type=int, default=contact_enricher.DEFAULT_CONCURRENCY, help=f"Outscraper requests in flight at once (default: {contact_enricher.DEFAULT_CONCURRENCY})")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the enrichment cache and look every website up again")
+    parser.add_argument("--cache-ttl-days", type=float, default=enrichment_cache.DEFAULT_TTL_DAYS, help=f"Reuse cached contacts up to this many days old (default: {enrichment_cache.DEFAULT_TTL_DAYS})")
+    
+    args = parser.parse_args()
+    limit = args.limit
     
     print(f"🚀 Enriching {limit} HOT LEADS with decision maker info...\n")
     
     try:
         # Step 1: Get hot leads from Google Sheets
-        hot_leads, header = get_hot_leads(limit)
+        hot_leads, header = get_hot_leads(limit, args.from_mirror)
         
         if not hot_leads:
             print("No HOT LEADS found")
             return
         
         # Step 2: Enrich with Outscraper
-        enriched_leads = enrich_with_outscraper(hot_leads)
+        enriched_leads = enrich_with_outscraper(hot_leads, args.batch_size, args.lookup_concurrency,
+                                                args.refresh, args.cache_ttl_days)
         
         # Step 3: Save results
         output_file = save_results(enriched_leads)
@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 """
 Enrich leads in a Google Sheet with decision maker information using Outscraper.
+
+With --incremental, only rows never enriched, enriched more than
+--stale-days ago, or that failed last time are picked, HOT LEADs first and
+then by rating. Each run writes back 'Enrichment Status' and 'Enriched At',
+so the next run resumes with the rows this one didn't reach.
 """
 
 import os
@@ -10,62 +15,89 @@ import argparse
 from datetime import datetime
 from dotenv import load_dotenv
 from outscraper import ApiClient
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from sheets_client import SPREADSHEET_ID, get_sheets
+import range_planner
+import sheet_reader
+import sheet_mirror
+import contact_enricher
+import enrichment_cache
+import contact_ranking
+from domains import normalize_domain
 
 load_dotenv()
 
 # Configuration
 OUTSCRAPER_API_KEY = os.getenv("OUTSCRAPER_API_KEY")
-SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
-CREDENTIALS_FILE = os.getenv("GOOGLE_SHEETS_CREDENTIALS_JSON")
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-
-def get_sheet_service():
-    if not SPREADSHEET_ID or not CREDENTIALS_FILE:
-        raise ValueError("GOOGLE_SPREADSHEET_ID or GOOGLE_SHEETS_CREDENTIALS_JSON not set in .env")
-    
-    creds = service_account.Credentials.from_service_account_file(
-        CREDENTIALS_FILE, scopes=SCOPES)
-    service = build('sheets', 'v4', credentials=creds)
-    return service.spreadsheets()
-
-def get_leads(sheet_name, limit=None):
-    """Read leads from Google Sheets"""
-    sheet = get_sheet_service()
-    
-    # Read all data from the sheet
-    result = sheet.values().get(
-        spreadsheetId=SPREADSHEET_ID,
-        range=f"'{sheet_name}'!A:Z"
-    ).execute()
-    
-    values = result.get('values', [])
-    if not values:
+
+# Only these columns are read; enrichment doesn't need the rest of the row
+READ_COLUMNS = ['Name', 'Website']
+# --incremental also needs what was done last time and what to prioritise by
+INCREMENTAL_COLUMNS = READ_COLUMNS + ['Enrichment Status', 'Enriched At', 'Lead_Score', 'Rating', 'rating']
+ENRICHED_AT_FORMAT = '%Y-%m-%d %H:%M'
+DEFAULT_STALE_DAYS = enrichment_cache.DEFAULT_TTL_DAYS
+
+def needs_enrichment(row, stale_days=DEFAULT_STALE_DAYS):
+    """True for rows never enriched, enriched too long ago, or whose last attempt failed."""
+    status = row.get('Enrichment Status', '').strip()
+    if not status or status.startswith('Error'):
+        return True
+    try:
+        enriched_at = datetime.strptime(row.get('Enriched At', '').strip(), ENRICHED_AT_FORMAT)
+    except ValueError:
+        return True
+    return (datetime.now() - enriched_at).total_seconds() > stale_days * 86400
+
+def priority(row):
+    """Sort key: HOT LEADs first, then highest rating, then sheet order."""
+    hot = row.get('Lead_Score', '').strip().upper() == 'HOT LEAD'
+    try:
+        rating = float(str(row.get('Rating') or row.get('rating') or '').replace(',', '.'))
+    except ValueError:
+        rating = 0.0
+    return (not hot, -rating, row['_row_number'])
+
+def select_pending(leads, limit, stale_days=DEFAULT_STALE_DAYS):
+    """The `limit` highest-priority rows that need enrichment."""
+    pending = sorted((lead for lead in leads if needs_enrichment(lead, stale_days)), key=priority)
+    print(f"{len(pending)} of {len(leads)} rows need enrichment")
+    return pending[:limit] if limit else pending
+
+def get_leads(sheet_name, limit=None, from_mirror=False, incremental=False, stale_days=DEFAULT_STALE_DAYS):
+    """Read leads from Google Sheets (or from the local mirror)"""
+    columns = INCREMENTAL_COLUMNS if incremental else READ_COLUMNS
+    # Every row has to be seen to rank the pending ones
+    read_limit = None if incremental else limit
+    
+    if from_mirror:
+        # Refresh only if the spreadsheet changed, so row numbers are safe to write back to
+        conn = sheet_mirror.open_mirror()
+        sheet_mirror.sync_tabs(conn, [sheet_name])
+        header = sheet_mirror.read_header(conn, sheet_name)
+        leads = sheet_mirror.find_rows(conn, sheet_name, columns, limit=read_limit) if header else []
+        conn.close()
+        print(f"Found {len(leads)} leads in '{sheet_name}'")
+        if incremental:
+            leads = select_pending(leads, limit, stale_days)
+        return leads, header
+
+    sheet = get_sheets()
+    
+    # Header and row count first, then just the needed columns, window by window
+    layout = sheet_reader.read_layout(sheet, SPREADSHEET_ID, sheet_name)
+    header = layout[0]
+    if not header:
         print("No data found in sheet")
         return [], []
     
-    # Parse header
-    header = values[0]
-    
-    # Get leads
-    leads = []
-    for i, row in enumerate(values[1:], start=2):  # Start at row 2 (1-indexed)
-        # Pad row to match header length
-        while len(row) < len(header):
-            row.append('')
-        
-        row_dict = dict(zip(header, row))
-        row_dict['_row_number'] = i
-        leads.append(row_dict)
-        
-        if limit and len(leads) >= limit:
-            break
+    leads = sheet_reader.find_rows(sheet, SPREADSHEET_ID, sheet_name, columns, limit=read_limit, layout=layout)
     
     print(f"Found {len(leads)} leads in '{sheet_name}'")
+    if incremental:
+        leads = select_pending(leads, limit, stale_days)
     return leads, header
 
-def enrich_with_outscraper(leads):
+def enrich_with_outscraper(leads, batch_size=contact_enricher.DEFAULT_BATCH_SIZE, concurrency=contact_enricher.DEFAULT_CONCURRENCY,
+                           refresh=False, ttl_days=enrichment_cache.DEFAULT_TTL_DAYS):
     """Use Outscraper to find decision maker emails from company websites"""
     if not OUTSCRAPER_API_KEY:
         raise ValueError("OUTSCRAPER_API_KEY not set in .env")
@@ -75,6 +107,13 @@ def enrich_with_outscraper(leads):
     
     print(f"\nEnriching {len(leads)} leads with Outscraper...")
     
+    # All websites are looked up up-front in async batches, then mapped back by domain;
+    # domains looked up recently are answered from the enrichment cache
+    cache = enrichment_cache.open_cache()
+    websites = [lead.get('Website', '').strip() for lead in leads if lead.get('Website', '').strip()]
+    found, errors = contact_enricher.fetch_contacts(client, websites, batch_size, concurrency,
+                                                    cache=cache, ttl_days=ttl_days, refresh=refresh)
+    
     for i, lead in enumerate(leads, 1):
         website = lead.get('Website', '').strip()
         company_name = lead.get('Name', 'Unknown')
@@ -87,15 +126,16 @@ def enrich_with_outscraper(leads):
             continue
         
         try:
-            print(f"  🔍 Scraping {website}...")
-            results = client.emails_and_contacts([website])
+            domain = normalize_domain(website)
+            if domain in errors:
+                raise Exception(errors[domain])
+            website_data = found.get(domain)
             
-            if not results or len(results) == 0:
+            if not website_data:
                 print(f"  ⚠️  No results found")
                 enriched_leads.append({**lead, 'Enrichment Status': 'No results'})
                 continue
             
-            website_data = results[0]
             emails = website_data.get('emails', [])
             
             if not emails:
@@ -103,31 +143,10 @@ def enrich_with_outscraper(leads):
                 enriched_leads.append({**lead, 'Enrichment Status': 'No emails'})
                 continue
             
-            # Find decision maker
-            decision_maker_keywords = ['vp', 'vice president', 'director', 'executive', 'ceo', 'president', 'owner', 'manager', 'founder', 'principal']
-            decision_maker_contact = None
-            
-            # 1. Search for keywords in title/level
-            for contact in emails:
-                if isinstance(contact, dict):
-                    title = contact.get('title', '').lower()
-                    level = contact.get('level', '').lower()
-                    for keyword in decision_maker_keywords:
-                        if keyword in title or keyword in level:
-                            decision_maker_contact = contact
-                            break
-                    if decision_maker_contact: break
+            # Most senior contact by title/level; falls back to any titled contact, then the first
+            decision_maker_contact = contact_ranking.pick_decision_maker(emails)
             
-            # 2. Fallback to any contact with a title
-            if not decision_maker_contact:
-                for contact in emails:
-                    if isinstance(contact, dict) and contact.get('title'):
-                        decision_maker_contact = contact
-                        break
-            
-            # 3. Fallback to first email
-            if not decision_maker_contact:
-                decision_maker_contact = emails[0] if emails else None
+            enrichment_cache.put_decision_maker(cache, website, decision_maker_contact)
             
             if decision_maker_contact and isinstance(decision_maker_contact, dict):
                 email = decision_maker_contact.get('value', '')
@@ -151,79 +170,49 @@ def enrich_with_outscraper(leads):
             print(f"  ❌ Error: {e}")
             enriched_leads.append({**lead, 'Enrichment Status': f'Error: {str(e)[:50]}'})
     
+    cache.close()
     return enriched_leads
 
 def update_google_sheet(enriched_leads, header, sheet_name):
     """Update the Google Sheet with enriched data"""
-    sheet = get_sheet_service()
+    sheet = get_sheets()
     
     # Determine columns to update/add
-    # We want to add: Contact Name, Contact Title, DM Email
-    new_columns = ['Contact Name', 'Contact Title', 'DM Email']
+    # We want to add: Contact Name, Contact Title, DM Email, plus the status --incremental resumes from
+    new_columns = ['Contact Name', 'Contact Title', 'DM Email', 'Enrichment Status', 'Enriched At']
+    enriched_at = datetime.now().strftime(ENRICHED_AT_FORMAT)
     
     # Check if columns exist, if not add them to header
-    col_indices = {}
     current_header = list(header)
     
-    # Update header in sheet if needed
-    header_updates = []
+    # Header cells and lead cells go through the same edit map: {(row, column index): value}
+    edits = {}
+    added = []
     for col in new_columns:
         if col not in current_header:
             current_header.append(col)
-            # Calculate column letter (e.g. 0->A, 25->Z, 26->AA)
-            col_idx = len(current_header) - 1
-            letter = ''
-            while col_idx >= 0:
-                letter = chr(col_idx % 26 + 65) + letter
-                col_idx = col_idx // 26 - 1
-            
-            header_updates.append({
-                'range': f"'{sheet_name}'!{letter}1",
-                'values': [[col]]
-            })
-    
-    if header_updates:
-        print(f"Adding new columns: {new_columns}")
-        sheet.values().batchUpdate(
-            spreadsheetId=SPREADSHEET_ID,
-            body={'valueInputOption': 'RAW', 'data': header_updates}
-        ).execute()
-        
-        # Re-read header to get correct indices (lazy way) or just calculate
-        # Let's just calculate indices based on current_header
-    
-    # Map column names to letters
-    def get_col_letter(col_name):
-        idx = current_header.index(col_name)
-        letter = ''
-        while idx >= 0:
-            letter = chr(idx % 26 + 65) + letter
-            idx = idx // 26 - 1
-        return letter
+            edits[(1, len(current_header) - 1)] = col
+            added.append(col)
+    
+    if added:
+        print(f"Adding new columns: {added}")
 
     print(f"\nUpdating Google Sheet...")
     
-    updates = []
     for lead in enriched_leads:
         row_num = lead['_row_number']
+        lead['Enriched At'] = enriched_at
         
         for col in new_columns:
             if col in lead:
-                letter = get_col_letter(col)
-                updates.append({
-                    'range': f"'{sheet_name}'!{letter}{row_num}",
-                    'values': [[lead[col]]]
-                })
+                edits[(row_num, current_header.index(col))] = lead[col]
     
-    if not updates:
+    if not edits:
         print("No updates to make")
         return
 
-    # Execute batch update
-    result = sheet.values().batchUpdate(
-        spreadsheetId=SPREADSHEET_ID,
-        body={'valueInputOption': 'RAW', 'data': updates}
-    ).execute()
+    # Adjacent cells are merged into rectangular ranges and sent in as few batches as possible
+    range_planner.write_edits(sheet, SPREADSHEET_ID, sheet_name, edits)
     
     print(f"✅ Updated {len(enriched_leads)} rows in Google Sheet")
 
@@ -231,16 +220,25 @@ def main():
     parser = argparse.ArgumentParser(description="Enrich leads in Google Sheet")
     parser.add_argument("--sheet", required=True, help="Name of the Google Sheet tab")
     parser.add_argument("--limit", type=int, default=10, help="Number of leads to enrich")
+    parser.add_argument("--incremental", action="store_true", help="Only enrich rows not enriched yet (or stale/failed), HOT LEADs and best-rated first")
+    parser.add_argument("--stale-days", type=float, default=DEFAULT_STALE_DAYS, help=f"With --incremental, re-enrich rows older than this (default: {DEFAULT_STALE_DAYS})")
+    parser.add_argument("--from-mirror", action="store_true", help="Select leads from the local mirror (re-pulled first only if the sheet changed)")
+    parser.add_argument("--batch-size", type=int, default=contact_enricher.DEFAULT_BATCH_SIZE, help=f"Websites per Outscraper request (default: {contact_enricher.DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--lookup-concurrency", type=int, default=contact_enricher.DEFAULT_CONCURRENCY, help=f"Outscraper requests in flight at once (default: {contact_enricher.DEFAULT_CONCURRENCY})")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the enrichment cache and look every website up again")
+    parser.add_argument("--cache-ttl-days", type=float, default=enrichment_cache.DEFAULT_TTL_DAYS, help=f"Reuse cached contacts up to this many days old (default: {enrichment_cache.DEFAULT_TTL_DAYS})")
     
     args = parser.parse_args()
     
-    print(f"🚀 Enriching {args.limit} leads in '{args.sheet}'...\n")
+    mode = "pending " if args.incremental else ""
+    print(f"🚀 Enriching {args.limit} {mode}leads in '{args.sheet}'...\n")
     
     try:
-        leads, header = get_leads(args.sheet, args.limit)
+        leads, header = get_leads(args.sheet, args.limit, args.from_mirror, args.incremental, args.stale_days)
         if not leads: return
         
-        enriched_leads = enrich_with_outscraper(leads)
+        enriched_leads = enrich_with_outscraper(leads, args.batch_size, args.lookup_concurrency,
+                                                args.refresh, args.cache_ttl_days)
         
         update_google_sheet(enriched_leads, header, args.sheet)
         
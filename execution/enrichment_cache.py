@@ -0,0 +1,95 @@
+"""
+Persistent per-domain cache of Outscraper contact lookups.
+
+The same company websites turn up across tabs and reruns, and every lookup
+costs Outscraper credits. Results are kept by normalized domain: the full
+contact list, the decision maker last chosen from it, and when it was fetched.
+Lookups that found nothing ("No results" / "No emails") are cached too, with
+a shorter TTL, so dead ends aren't paid for on every run. Failed lookups are
+never cached.
+"""
+
+import os
+import json
+import time
+import sqlite3
+
+from domains import normalize_domain
+
+CACHE_PATH = os.getenv("ENRICHMENT_CACHE_PATH", os.path.join(".cache", "enrichment_cache.sqlite"))
+DEFAULT_TTL_DAYS = 30
+DEFAULT_NEGATIVE_TTL_DAYS = 7
+
+FOUND = 'found'
+NO_RESULTS = 'no_results'
+NO_EMAILS = 'no_emails'
+
+def open_cache(path=CACHE_PATH):
+    """Open (creating if needed) the cache database."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS contacts (
+            domain TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            contacts TEXT NOT NULL,
+            decision_maker TEXT,
+            fetched_at REAL NOT NULL
+        )
+    """)
+    return conn
+
+def get_entry(conn, website, ttl_days=DEFAULT_TTL_DAYS, negative_ttl_days=DEFAULT_NEGATIVE_TTL_DAYS):
+    """Return {'status', 'contacts', 'decision_maker', 'fetched_at'} for `website`'s domain, or None if missing or expired."""
+    domain = normalize_domain(website)
+    if not domain:
+        return None
+
+    row = conn.execute(
+        "SELECT status, contacts, decision_maker, fetched_at FROM contacts WHERE domain = ?",
+        (domain,)
+    ).fetchone()
+    if not row:
+        return None
+
+    status, contacts, decision_maker, fetched_at = row
+    ttl = ttl_days if status == FOUND else negative_ttl_days
+    if time.time() - fetched_at > ttl * 86400:
+        return None
+
+    return {
+        'status': status,
+        'contacts': json.loads(contacts),
+        'decision_maker': json.loads(decision_maker) if decision_maker else None,
+        'fetched_at': fetched_at,
+    }
+
+def put_result(conn, website, website_data):
+    """Store a lookup result; `website_data` is None when Outscraper returned nothing."""
+    domain = normalize_domain(website)
+    if not domain:
+        return
+
+    emails = (website_data or {}).get('emails') or []
+    if website_data is None:
+        status = NO_RESULTS
+    else:
+        status = FOUND if emails else NO_EMAILS
+    conn.execute(
+        "INSERT OR REPLACE INTO contacts (domain, status, contacts, decision_maker, fetched_at) VALUES (?, ?, ?, NULL, ?)",
+        (domain, status, json.dumps(emails), time.time())
+    )
+    conn.commit()
+
+def put_decision_maker(conn, website, contact):
+    """Record which contact was chosen as the decision maker for `website`'s domain."""
+    domain = normalize_domain(website)
+    if not domain:
+        return
+    conn.execute(
+        "UPDATE contacts SET decision_maker = ? WHERE domain = ?",
+        (json.dumps(contact) if contact is not None else None, domain)
+    )
+    conn.commit()
@@ -1,150 +1,553 @@
 import os
-import sys
-import json
+import re
 import glob
+import time
+import random
 import asyncio
-import pandas as pd
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import httpx
 import gspread
 from gspread_formatting import *
 from playwright.async_api import async_playwright
 from dotenv import load_dotenv
+import fingerprints
+import probe_cache
+import probe_journal
+import preflight
+from domains import hostname, normalize_domain
+from sheets_client import SPREADSHEET_ID, get_gspread_client, get_revision
+import dedup_index
+import sheet_formatting
+import sheet_writer
+import lead_filter
+from lead_stream import iter_leads
 
 load_dotenv()
 
 # Configuration
 OUTPUT_DIR = "output"
 SHEET_NAME = "Qualified Leads"
-GOOGLE_CREDENTIALS_FILE = os.getenv("GOOGLE_SHEETS_CREDENTIALS_JSON")
-GOOGLE_SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
+DEFAULT_CONCURRENCY = 5
+DEFAULT_HTTP_CONCURRENCY = 50
+DEFAULT_FLUSH_EVERY = 100
+DEFAULT_FLUSH_SECONDS = 60
+# Batches waiting for upload; while full, scored leads pile up into a bigger next batch
+MAX_PENDING_BATCHES = 2
+# Attempts per batch upload (e.g. a 429 from gspread) before the writer gives up
+UPLOAD_RETRIES = 5
+HTTP_TIMEOUT = 10
+HTTP_CONNECT_TIMEOUT = 5
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Browser probe: resource types never downloaded
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet'}
+LATE_REQUEST_GRACE = 1.5
+
+# HTTP fast path: responses that have to be escalated to a real browser
+BLOCKED_STATUS_CODES = {401, 403, 406, 429, 503}
+BLOCKED_MARKERS = ['cf-browser-verification', 'cf-challenge', 'challenge-platform', 'captcha', 'just a moment...']
+JS_SHELL_MARKERS = ['enable javascript', 'javascript is required', 'javascript to run this app']
+MIN_STATIC_WORDS = 50
+SCRIPT_STYLE_RE = re.compile(r'<(script|style|noscript)\b.*?</\1>', re.S)
+TAG_RE = re.compile(r'<[^>]+>')
+
+# Qualified Leads formatting, applied over rows 2..last data row
+OUTREACH_STATUSES = ['To Contact', 'In Progress', 'Demo Booked', 'Not Interested']
+FORMAT_SPEC = {
+    'validation': [{'column': 'Outreach_Status', 'values': OUTREACH_STATUSES}],
+    'highlights': [
+        {'column': 'Outreach_Status', 'equals': 'To Contact', 'background': (1, 0.8, 0.8)},  # Light Red
+        {'column': 'Outreach_Status', 'equals': 'In Progress', 'background': (1, 1, 0.8)},  # Light Yellow
+        {'column': 'Outreach_Status', 'equals': 'Demo Booked', 'background': (0.8, 1, 0.8)},  # Light Green
+        {'column': 'Outreach_Status', 'equals': 'Not Interested', 'background': (0.9, 0.9, 0.9)},  # Light Gray
+        {'column': 'Lead_Score', 'equals': 'HOT LEAD', 'background': (0, 1, 0), 'bold': True},  # Bright Green
+    ],
+}
 
 def get_latest_file():
-    """Get the most recent JSON file from the output directory."""
-    files = glob.glob(os.path.join(OUTPUT_DIR, "*.json"))
+    """Get the most recent JSON or NDJSON file from the output directory."""
+    files = [path for pattern in ("*.json", "*.ndjson", "*.jsonl") for path in glob.glob(os.path.join(OUTPUT_DIR, pattern))]
     if not files:
         return None
     return max(files, key=os.path.getctime)
 
-def filter_leads(leads):
-    """Filter leads based on criteria."""
-    filtered = []
-    for lead in leads:
-        # Normalize fields (handle both Google Maps and Leads Finder formats)
-        rating = lead.get('totalScore', lead.get('rating'))
-        reviews = lead.get('reviewsCount', lead.get('reviews'))
-        website = lead.get('website', lead.get('company_website'))
-        
-        # Criteria 1: Website must be valid
-        if not website:
-            continue
-            
-        # Criteria 2: Rating < 4.5 (or missing)
-        # If rating is present, it must be < 4.5. If missing, we keep it (opportunity).
-        if rating is not None and str(rating).strip() != '':
-            try:
-                if float(rating) >= 4.5:
-                    continue
-            except ValueError:
-                pass # Keep if rating is weird
-                
-        # Criteria 3: Reviews < 50 (or missing)
-        # If reviews is present, it must be < 50. If missing, we keep it.
-        if reviews is not None and str(reviews).strip() != '':
-            try:
-                if int(reviews) >= 50:
-                    continue
-            except ValueError:
-                pass
-        
-        filtered.append(lead)
-    return filtered
+def filter_leads(leads, max_rating=lead_filter.DEFAULT_MAX_RATING, max_reviews=lead_filter.DEFAULT_MAX_REVIEWS):
+    """Filter leads based on criteria. `leads` can be any iterable, e.g. a lead stream.
+    
+    Criteria: a website is required; rating below `max_rating` and reviews
+    below `max_reviews` when present (missing values are kept as opportunities).
+    """
+    return lead_filter.filter_leads(leads, max_rating, max_reviews)
+
+def normalize_url(url):
+    """Add http if missing."""
+    if not url.startswith('http'):
+        url = 'http://' + url
+    return url
+
+def merge_signals(signals, found):
+    """Merge a fingerprints.scan() result into `signals` in place."""
+    for category, technologies in found.items():
+        signals.setdefault(category, set()).update(technologies)
+    return signals
+
+def has_verdicts(signals):
+    """True once both the pixel and the chat verdict are positive."""
+    return bool(signals.get('pixel')) and bool(signals.get('chat'))
+
+async def block_heavy_resources(route):
+    """Abort images, fonts, media and stylesheets; nothing we detect lives in them."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
 
 async def check_website(page, url):
-    """Check website for pixels and chat widgets."""
+    """Check website for pixels and chat widgets.
+    
+    Returns a probe dict: 'signals' ({category: set of technologies} from the
+    fingerprint registry), 'http_status' and 'final_url'. Every request the
+    page makes is matched too, so tags injected after DOM load are still
+    caught. Navigation ends as soon as both a pixel and a chat widget are
+    seen; otherwise the DOM is scanned and late requests get a short grace
+    period. `page` should be blank: listeners attach before navigating.
+    """
+    signals = {}
+    probe = {'signals': signals, 'http_status': None, 'final_url': None}
+    both_found = asyncio.Event()
+    
+    def on_request(request):
+        merge_signals(signals, fingerprints.scan(request.url))
+        if has_verdicts(signals):
+            both_found.set()
+    
+    def on_response(response):
+        # Main-frame document status, so an early exit still has one (redirects: the last wins)
+        request = response.request
+        if request.is_navigation_request() and request.frame == page.main_frame:
+            probe['http_status'] = response.status
+    
+    page.on('request', on_request)
+    page.on('response', on_response)
+    navigation = None
     try:
-        # Add http if missing
-        if not url.startswith('http'):
-            url = 'http://' + url
-            
-        response = await page.goto(url, timeout=15000, wait_until="domcontentloaded")
+        url = normalize_url(url)
+        
+        navigation = asyncio.ensure_future(page.goto(url, timeout=15000, wait_until="domcontentloaded"))
+        early_exit = asyncio.ensure_future(both_found.wait())
+        await asyncio.wait({navigation, early_exit}, return_when=asyncio.FIRST_COMPLETED)
+        early_exit.cancel()
+        
+        if both_found.is_set():
+            probe['final_url'] = page.url
+            return probe
+        
+        response = navigation.result()
         if not response:
-            return False, False
+            return probe
+        probe['http_status'] = response.status
+        probe['final_url'] = page.url
             
         content = await page.content()
-        content = content.lower()
-        
-        # Check for pixels
-        pixel_indicators = ['fbevents.js', 'facebook-pixel', 'gtm-']
-        pixel_found = any(ind in content for ind in pixel_indicators)
+        merge_signals(signals, fingerprints.scan(content))
         
-        # Check for chat
-        chat_indicators = ['intercom', 'drift', 'tidio', 'chat-widget', 'highlevel', 'podium']
-        chat_found = any(ind in content for ind in chat_indicators)
+        # Widgets are often injected after DOMContentLoaded
+        if not has_verdicts(signals):
+            try:
+                await asyncio.wait_for(both_found.wait(), timeout=LATE_REQUEST_GRACE)
+            except asyncio.TimeoutError:
+                pass
         
-        return pixel_found, chat_found
+        return probe
         
     except Exception as e:
         # print(f"Error checking {url}: {e}")
-        return False, False
+        return probe
+    finally:
+        page.remove_listener('request', on_request)
+        page.remove_listener('response', on_response)
+        if navigation and not navigation.done():
+            navigation.cancel()
+            await asyncio.gather(navigation, return_exceptions=True)
+
+def needs_browser(status_code, html):
+    """Decide whether a static HTTP response is good enough to score from.
+    
+    Blocked responses (bot walls, rate limits) and near-empty JavaScript app
+    shells have to be rendered by a real browser before the markers show up.
+    """
+    if status_code in BLOCKED_STATUS_CODES:
+        return True
+    
+    lowered = html.lower()
+    if any(marker in lowered for marker in BLOCKED_MARKERS):
+        return True
+    if any(marker in lowered for marker in JS_SHELL_MARKERS):
+        return True
+    
+    # Very little visible text once scripts, styles and tags are gone: SPA shell
+    visible_text = TAG_RE.sub(' ', SCRIPT_STYLE_RE.sub(' ', lowered))
+    return len(visible_text.split()) < MIN_STATIC_WORDS
 
-async def enrich_leads(leads):
-    """Enrich leads using Playwright."""
-    print(f"Enriching {len(leads)} leads...")
+async def check_website_http(client, url):
+    """Fetch the raw HTML and score it without a browser.
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    Returns a probe dict like check_website, or None when the lead has to be
+    escalated to the browser (transport error, blocked, or JS-rendered).
+    """
+    try:
+        response = await client.get(normalize_url(url))
+        html = response.text
+    except Exception:
+        return None
+    
+    signals = fingerprints.scan(html)
+    probe = {'signals': signals, 'http_status': response.status_code, 'final_url': str(response.url)}
+    
+    # Both markers already visible: nothing a browser could add
+    if has_verdicts(signals):
+        return probe
+    
+    if needs_browser(response.status_code, html):
+        return None
+    return probe
+
+async def reset_page(context, page):
+    """Stop whatever `page` is still loading by navigating it to about:blank.
+
+    An early exit or timeout leaves the old site loading; its late requests
+    would otherwise reach the next lead's listeners. A page that can't be
+    reset is replaced.
+    """
+    try:
+        await page.goto('about:blank', timeout=5000)
+        return page
+    except Exception:
+        if not page.is_closed():
+            await page.close()
+        return await context.new_page()
+
+async def check_website_in_pool(context, pages, url):
+    """Borrow a page from the shared pool, probe the url with it and hand it back blank."""
+    page = await pages.get()
+    try:
+        # A crashed page would poison every later lead that borrows it
+        if page.is_closed():
+            page = await context.new_page()
+        return await check_website(page, url)
+    finally:
+        try:
+            page = await reset_page(context, page)
+        finally:
+            pages.put_nowait(page)
+
+def score_lead(lead, probe):
+    """Attach probe results, lead score and default outreach status to a copy of the lead."""
+    signals = probe['signals']
+    pixel_found = bool(signals.get('pixel'))
+    chat_found = bool(signals.get('chat'))
+    
+    lead = lead.copy()
+    lead['Pixel_Status'] = pixel_found
+    lead['Chat_Status'] = chat_found
+    lead['Technologies'] = {category: sorted(names) for category, names in signals.items()}
+    lead['Website_Status'] = probe.get('status', preflight.LIVE)
+    lead['Probe_Path'] = probe['path']
+    lead['HTTP_Status'] = probe.get('http_status')
+    lead['Final_URL'] = probe.get('final_url')
+    
+    # Scoring Logic
+    if lead['Website_Status'] != preflight.LIVE:
+        lead['Lead_Score'] = 'Dead Website'
+    elif pixel_found and not chat_found:
+        lead['Lead_Score'] = 'HOT LEAD'
+    else:
+        lead['Lead_Score'] = 'Warm Lead'
+    
+    # Default Outreach Status
+    lead['Outreach_Status'] = 'To Contact'
+    return lead
+
+def lead_website(lead):
+    """Website field in any of the supported scrape formats."""
+    return lead_filter.canonical_value(lead, 'website')
+
+async def probe_worker(queue, probes, progress, probe, cache=None, journal_path=None, on_probe=None):
+    """Pull (index, website) items off the queue until it is empty, probing each with `probe`.
+    
+    Each result is persisted (probe cache, journal) before anything else sees it.
+    """
+    while True:
+        try:
+            index, website = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        
+        result = await probe(website)
+        result['probed_at'] = time.time()
+        if cache is not None:
+            probe_cache.put_probe(cache, website, result)
+        if journal_path:
+            probe_journal.append_probe(journal_path, index, website, result)
+        probes[index] = result
+        if on_probe:
+            on_probe(index, result)
         
-        enriched = []
+        progress['done'] += 1
+        if progress['done'] % progress['every'] == 0 or progress['done'] == progress['total']:
+            # One write per line so shard processes sharing stdout don't interleave
+            print(f"{progress['label']}Processed {progress['done']}/{progress['total']}\n", end='', flush=True)
+
+def new_http_client(concurrency):
+    """Pooled keep-alive HTTP/2 client for the static fast path."""
+    return httpx.AsyncClient(
+        http2=True,
+        follow_redirects=True,
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        headers={'User-Agent': USER_AGENT, 'Accept': 'text/html,application/xhtml+xml'},
+    )
+
+def lookup_cached(leads, cache, ttl_days, refresh):
+    """Score leads whose domain has a fresh cached probe.
+    
+    Returns (results, pending) where results holds the scored cache hits in
+    input order (None for misses) and pending lists the indices to probe.
+    """
+    results = [None] * len(leads)
+    pending = []
+    for index, lead in enumerate(leads):
+        cached = None
+        if cache is not None and not refresh:
+            cached = probe_cache.get_probe(cache, lead_website(lead), ttl_days)
         
-        # Process in chunks to avoid overwhelming resources
-        chunk_size = 5
-        for i in range(0, len(leads), chunk_size):
-            chunk = leads[i:i+chunk_size]
-            tasks = []
+        if cached:
+            cached['path'] = 'cache'
+            results[index] = score_lead(lead, cached)
+        else:
+            pending.append(index)
+    
+    if cache is not None:
+        print(f"Probe cache: {len(leads) - len(pending)} hits, {len(pending)} misses" + (" (refresh)" if refresh else ""))
+    return results, pending
+
+async def probe_websites(items, concurrency=DEFAULT_CONCURRENCY, probe_mode='browser', http_concurrency=DEFAULT_HTTP_CONCURRENCY,
+                         cache_path=None, journal_path=None, label='', on_probe=None):
+    """Probe (index, website) items with one browser and return {index: probe}.
+    
+    `concurrency` long-lived pages are shared through a pool; workers pull the
+    next website from a queue as soon as they finish the previous one, so a
+    single slow site only ties up its own slot. In 'http-first' mode
+    `http_concurrency` workers fetch raw HTML and only borrow a page when the
+    response is blocked or JS-rendered. Results are written to the probe cache
+    at `cache_path` and the journal at `journal_path` as they arrive, then
+    handed to `on_probe(index, probe)`.
+    """
+    concurrency = max(1, min(concurrency, len(items)))
+    workers_count = concurrency
+    if probe_mode == 'http-first':
+        workers_count = max(1, min(http_concurrency, len(items)))
+        print(f"{label}Enriching {len(items)} leads over HTTP ({workers_count} connections, {concurrency} fallback pages)...\n", end='', flush=True)
+    else:
+        print(f"{label}Enriching {len(items)} leads with {concurrency} pages...\n", end='', flush=True)
+    
+    queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+    
+    probes = {}
+    progress = {'done': 0, 'total': len(items), 'every': workers_count, 'label': label}
+    cache = probe_cache.open_cache(cache_path) if cache_path else None
+    
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            context = await browser.new_context(user_agent=USER_AGENT)
+            await context.route("**/*", block_heavy_resources)
             
-            # Create a new page for each task to run in parallel
-            pages = []
-            for lead in chunk:
-                page = await context.new_page()
-                pages.append(page)
-                website = lead.get('website', lead.get('company_website'))
-                tasks.append(check_website(page, website))
+            pages = asyncio.Queue()
+            for _ in range(concurrency):
+                pages.put_nowait(await context.new_page())
             
-            results = await asyncio.gather(*tasks)
+            async def probe_with_browser(website):
+                result = await check_website_in_pool(context, pages, website)
+                result['path'] = 'browser'
+                return result
             
-            for j, (pixel_found, chat_found) in enumerate(results):
-                lead = chunk[j].copy()
-                lead['Pixel_Status'] = pixel_found
-                lead['Chat_Status'] = chat_found
+            client = None
+            if probe_mode == 'http-first':
+                client = new_http_client(workers_count)
                 
-                # Scoring Logic
-                if pixel_found and not chat_found:
-                    lead['Lead_Score'] = 'HOT LEAD'
-                else:
-                    lead['Lead_Score'] = 'Warm Lead'
-                
-                # Default Outreach Status
-                lead['Outreach_Status'] = 'To Contact'
-                
-                enriched.append(lead)
-                
-            # Close pages
-            for page in pages:
-                await page.close()
-                
-            print(f"Processed {min(i+chunk_size, len(leads))}/{len(leads)}")
+                async def probe(website):
+                    result = await check_website_http(client, website)
+                    if result is None:
+                        return await probe_with_browser(website)
+                    result['path'] = 'http'
+                    return result
+            else:
+                probe = probe_with_browser
             
-        await browser.close()
-        return enriched
+            try:
+                workers = [
+                    asyncio.create_task(probe_worker(queue, probes, progress, probe, cache, journal_path, on_probe))
+                    for _ in range(workers_count)
+                ]
+                await asyncio.gather(*workers)
+            finally:
+                if client:
+                    await client.aclose()
+            
+            await browser.close()
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    return probes
 
-def update_google_sheet(leads):
-    """Update Google Sheet with enriched leads."""
-    if not leads:
-        print("No leads to upload.")
-        return
+def run_shard(shard_number, shards, items, concurrency, probe_mode, http_concurrency, cache_path, journal_path):
+    """Entry point of a shard worker process: its own event loop, browser and page pool."""
+    label = f"[shard {shard_number}/{shards}] "
+    return asyncio.run(probe_websites(items, concurrency, probe_mode, http_concurrency, cache_path, journal_path, label))
+
+async def probe_sharded(items, shards, concurrency, probe_mode, http_concurrency, cache_path, journal_path, on_probe=None):
+    """Split items across `shards` worker processes and merge their {index: probe} results.
+    
+    `on_probe` is called in this process for each result as its shard finishes.
+    """
+    # Round-robin so slow stretches of the input are spread over every shard
+    shard_items = [items[k::shards] for k in range(shards)]
+    print(f"Probing {len(items)} leads across {shards} processes ({concurrency} pages each)...")
+    
+    loop = asyncio.get_running_loop()
+    # Spawn, not fork: children must not inherit this process's running event loop
+    with ProcessPoolExecutor(max_workers=shards, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [
+            loop.run_in_executor(pool, run_shard, k + 1, shards, chunk, concurrency, probe_mode, http_concurrency, cache_path, journal_path)
+            for k, chunk in enumerate(shard_items)
+        ]
+        probes = {}
+        for future in asyncio.as_completed(futures):
+            shard_probes = await future
+            probes.update(shard_probes)
+            if on_probe:
+                for index, result in shard_probes.items():
+                    on_probe(index, result)
+    return probes
+
+def lookup_journaled(leads, results, pending, journal_path):
+    """Score pending leads that an interrupted run already probed; return what is still pending."""
+    journaled = probe_journal.read_journal(journal_path)
+    still_pending = []
+    for index in pending:
+        entry = journaled.get(index)
+        # The journal is keyed by position; make sure it's still the same lead
+        if entry and entry[0] == lead_website(leads[index]):
+            entry[1]['path'] = 'journal'
+            results[index] = score_lead(leads[index], entry[1])
+        else:
+            still_pending.append(index)
+    
+    print(f"Resumed {len(pending) - len(still_pending)} leads from journal, {len(still_pending)} left to probe")
+    return still_pending
 
-    gc = gspread.service_account(filename=GOOGLE_CREDENTIALS_FILE)
-    sh = gc.open_by_key(GOOGLE_SPREADSHEET_ID)
+async def preflight_pending(leads, results, pending, cache_path, ttl_hours, concurrency, journal_path=None):
+    """Resolve and TCP-connect every pending lead's host; score dead ones and return the live indices."""
+    hosts = {index: hostname(lead_website(leads[index])) for index in pending}
+    
+    statuses = {}
+    cache = probe_cache.open_cache(cache_path) if cache_path else None
+    try:
+        if cache is not None:
+            for host in set(hosts.values()):
+                status = probe_cache.get_preflight(cache, host, ttl_hours)
+                if status:
+                    statuses[host] = status
+        cached_count = len(statuses)
+        
+        checked = await preflight.check_hosts([host for host in hosts.values() if host not in statuses], concurrency)
+        statuses.update(checked)
+        if cache is not None:
+            probe_cache.put_preflight(cache, checked)
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    live = []
+    for index in pending:
+        status = statuses[hosts[index]]
+        if status == preflight.LIVE:
+            live.append(index)
+            continue
+        
+        website = lead_website(leads[index])
+        result = {'signals': {}, 'http_status': None, 'final_url': None, 'status': status, 'path': 'preflight', 'probed_at': time.time()}
+        if journal_path:
+            probe_journal.append_probe(journal_path, index, website, result)
+        results[index] = score_lead(leads[index], result)
+    
+    print(f"Pre-flight: {len(live)} live, {len(pending) - len(live)} dead ({cached_count} of {len(statuses)} hosts cached)")
+    return live
+
+async def enrich_leads(leads, concurrency=DEFAULT_CONCURRENCY, probe_mode='browser', http_concurrency=DEFAULT_HTTP_CONCURRENCY,
+                       shards=1, cache_path=probe_cache.CACHE_PATH, cache_ttl_days=probe_cache.DEFAULT_TTL_DAYS, refresh=False,
+                       journal_path=None, resume=False, on_scored=None,
+                       preflight_hosts=True, preflight_ttl_hours=probe_cache.DEFAULT_PREFLIGHT_TTL_HOURS,
+                       preflight_concurrency=preflight.DEFAULT_CONCURRENCY):
+    """Enrich leads using Playwright, optionally behind an HTTP fast path.
+    
+    Leads whose domain has a fresh entry in the probe cache, or (with
+    `resume`) that are already in the journal, are scored from there. The
+    rest go through a DNS/TCP pre-flight that marks dead hosts straight away;
+    only live ones are probed, in this process or split across `shards`
+    worker processes, and journaled as they finish. Every scored lead is passed to
+    `on_scored(lead)` as soon as it is ready. Results keep the input order.
+    """
+    cache = probe_cache.open_cache(cache_path) if cache_path else None
+    try:
+        results, pending = lookup_cached(leads, cache, cache_ttl_days, refresh)
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    if journal_path:
+        probe_journal.start_journal(journal_path, resume)
+        if resume:
+            pending = lookup_journaled(leads, results, pending, journal_path)
+    
+    if preflight_hosts and pending:
+        pending = await preflight_pending(leads, results, pending, cache_path, preflight_ttl_hours, preflight_concurrency, journal_path)
+    
+    if on_scored:
+        for lead in results:
+            if lead is not None:
+                on_scored(lead)
+    if not pending:
+        return results
+    
+    def on_probe(index, result):
+        results[index] = score_lead(leads[index], result)
+        if on_scored:
+            on_scored(results[index])
+    
+    items = [(index, lead_website(leads[index])) for index in pending]
+    shards = max(1, min(shards, len(items)))
+    if shards > 1:
+        probes = await probe_sharded(items, shards, concurrency, probe_mode, http_concurrency, cache_path, journal_path, on_probe)
+    else:
+        probes = await probe_websites(items, concurrency, probe_mode, http_concurrency, cache_path, journal_path, on_probe=on_probe)
+    
+    paths = {}
+    for result in probes.values():
+        paths[result['path']] = paths.get(result['path'], 0) + 1
+    
+    print(f"Probe paths: {paths.get('http', 0)} via HTTP, {paths.get('browser', 0)} via browser")
+    return results
+
+def open_worksheet():
+    """Open the Qualified Leads worksheet, creating it with headers if needed."""
+    sh = get_gspread_client().open_by_key(SPREADSHEET_ID)
     
     try:
         worksheet = sh.worksheet(SHEET_NAME)
@@ -155,33 +558,44 @@ def update_google_sheet(leads):
         worksheet.append_row(headers)
         # Format headers
         format_cell_range(worksheet, '1:1', CellFormat(textFormat=TextFormat(bold=True)))
+    return worksheet
+
+def update_google_sheet(leads):
+    """Update Google Sheet with enriched leads. Returns how many rows were added."""
+    if not leads:
+        print("No leads to upload.")
+        return 0
+
+    worksheet = open_worksheet()
 
-    # Get existing websites to prevent duplicates
-    existing_records = worksheet.get_all_records()
-    existing_websites = set(str(r.get('Website', '')).lower().strip() for r in existing_records)
+    # Websites already in the tab come from the local index; the tab itself is
+    # only read (Website column only) when its revision has moved on
+    index = dedup_index.open_index()
+    dedup_index.reconcile(index, worksheet, SPREADSHEET_ID, SHEET_NAME, get_revision())
     
     # Prepare new rows
     new_rows = []
+    new_domains = set()
     for lead in leads:
-        website = str(lead.get('website', lead.get('company_website', ''))).lower().strip()
+        domain = normalize_domain(lead_website(lead))
         
-        if website in existing_websites:
+        if domain and (domain in new_domains or dedup_index.contains(index, SPREADSHEET_ID, SHEET_NAME, domain)):
             continue
             
         # Map fields
         row = [
-            lead.get('title', lead.get('name', lead.get('company_name', ''))),
-            lead.get('website', lead.get('company_website', '')),
-            lead.get('phone', lead.get('phoneUnformatted', '')),
-            lead.get('totalScore', lead.get('rating', '')),
-            lead.get('reviewsCount', lead.get('reviews', '')),
+            lead_filter.canonical_value(lead, 'name', ''),
+            lead_filter.canonical_value(lead, 'website', ''),
+            lead_filter.canonical_value(lead, 'phone', ''),
+            lead_filter.canonical_value(lead, 'rating', ''),
+            lead_filter.canonical_value(lead, 'reviews', ''),
             str(lead.get('Pixel_Status')),
             str(lead.get('Chat_Status')),
             lead.get('Lead_Score'),
             lead.get('Outreach_Status')
         ]
         new_rows.append(row)
-        existing_websites.add(website) # Add to set to prevent dupes within this batch
+        new_domains.add(domain) # Add to set to prevent dupes within this batch
     
     if new_rows:
         worksheet.append_rows(new_rows)
@@ -189,103 +603,196 @@ def update_google_sheet(leads):
         
         # Apply Formatting
         apply_formatting(worksheet)
+        
+        # Our own append and formatting move the revision; record it after both so the next run skips the read
+        dedup_index.add_domains(index, SPREADSHEET_ID, SHEET_NAME, new_domains, get_revision())
     else:
         print("No new leads to add (all duplicates).")
+    index.close()
+    return len(new_rows)
 
 def apply_formatting(worksheet):
-    """Apply conditional formatting and dropdowns."""
-    
-    # Define ranges (assuming headers are in row 1)
-    # Outreach_Status is column I (9)
-    # Lead_Score is column H (8)
-    
-    # Data Validation for Outreach_Status
-    rule = DataValidationRule(
-        condition=BooleanCondition('ONE_OF_LIST', ['To Contact', 'In Progress', 'Demo Booked', 'Not Interested']),
-        showCustomUi=True
-    )
-    set_data_validation_for_cell_range(worksheet, 'I2:I1000', rule)
-    
-    # Conditional Formatting for Outreach_Status colors
-    rules = get_conditional_format_rules(worksheet)
-    
-    # Remove old rules for these columns to avoid stacking
-    # (Simplified: just adding new ones for now)
-    
-    # To Contact (Red)
-    rules.append(ConditionalFormatRule(
-        ranges=[GridRange.from_a1_range('I2:I1000', worksheet)],
-        booleanRule=BooleanRule(
-            condition=BooleanCondition('TEXT_EQ', ['To Contact']),
-            format=CellFormat(backgroundColor=Color(1, 0.8, 0.8)) # Light Red
-        )
-    ))
-    # In Progress (Yellow)
-    rules.append(ConditionalFormatRule(
-        ranges=[GridRange.from_a1_range('I2:I1000', worksheet)],
-        booleanRule=BooleanRule(
-            condition=BooleanCondition('TEXT_EQ', ['In Progress']),
-            format=CellFormat(backgroundColor=Color(1, 1, 0.8)) # Light Yellow
-        )
-    ))
-    # Demo Booked (Green)
-    rules.append(ConditionalFormatRule(
-        ranges=[GridRange.from_a1_range('I2:I1000', worksheet)],
-        booleanRule=BooleanRule(
-            condition=BooleanCondition('TEXT_EQ', ['Demo Booked']),
-            format=CellFormat(backgroundColor=Color(0.8, 1, 0.8)) # Light Green
-        )
-    ))
-    # Not Interested (Gray)
-    rules.append(ConditionalFormatRule(
-        ranges=[GridRange.from_a1_range('I2:I1000', worksheet)],
-        booleanRule=BooleanRule(
-            condition=BooleanCondition('TEXT_EQ', ['Not Interested']),
-            format=CellFormat(backgroundColor=Color(0.9, 0.9, 0.9)) # Light Gray
-        )
-    ))
-    
-    # Lead_Score HOT LEAD (Green)
-    rules.append(ConditionalFormatRule(
-        ranges=[GridRange.from_a1_range('H2:H1000', worksheet)],
-        booleanRule=BooleanRule(
-            condition=BooleanCondition('TEXT_EQ', ['HOT LEAD']),
-            format=CellFormat(
-                backgroundColor=Color(0, 1, 0), # Bright Green
-                textFormat=TextFormat(bold=True)
-            )
-        )
-    ))
-    
-    rules.save()
-    print("Formatting applied.")
+    """Apply conditional formatting and dropdowns (see FORMAT_SPEC).
+
+    Re-running is safe: rules are diffed against the tab, stacked duplicates
+    are removed, and an up-to-date tab gets no write at all.
+    """
+    sent = sheet_formatting.apply_spec(worksheet, FORMAT_SPEC)
+    print(f"Formatting applied ({sent} changes)." if sent else "Formatting already up to date.")
+
+class SheetWriter:
+    """Upload stage that runs alongside probing.
+
+    Scored leads are buffered and cut into a batch once `batch_size` have
+    arrived or `flush_seconds` have passed. Batches go through a bounded queue
+    to a task that uploads them in a worker thread (dedup and formatting per
+    batch), so the event loop keeps probing while the sheet is written. When
+    the sheet is slower than probing the queue fills up and batches simply
+    grow; probing never waits on the upload. A failing upload is retried with
+    backoff; if it keeps failing, the writer stops and its error is raised
+    from the next add() or from close().
+    """
+
+    def __init__(self, batch_size=DEFAULT_FLUSH_EVERY, flush_seconds=DEFAULT_FLUSH_SECONDS):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue = asyncio.Queue(maxsize=MAX_PENDING_BATCHES)
+        self.buffer = []
+        self.queued = 0  # leads in batches waiting in the queue
+        self.rows = 0
+        self.task = None
+        self.reported = False
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+        return self
+
+    def add(self, lead):
+        """on_scored callback: buffer a lead, cutting a batch when it is full."""
+        self.buffer.append(lead)
+        if len(self.buffer) >= self.batch_size:
+            self.cut()
+
+    def check(self):
+        """Re-raise the writer task's error if it has died (from add() this stops probing)."""
+        if self.task and self.task.done():
+            if self.task.cancelled() or self.task.exception():
+                self.report_failure()
+            self.task.result()
+            raise RuntimeError("Sheet writer stopped early")
+
+    def report_failure(self):
+        if not self.reported:
+            self.reported = True
+            print(f"❌ Sheet writer failed with {len(self.buffer) + self.queued} scored leads not uploaded; "
+                  f"re-run with --resume to upload them")
+
+    def cut(self):
+        self.check()
+        if self.buffer and not self.queue.full():
+            self.queue.put_nowait(self.buffer)
+            self.queued += len(self.buffer)
+            self.buffer = []
+
+    async def run(self):
+        started = time.time()
+        while True:
+            try:
+                batch = await asyncio.wait_for(self.queue.get(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                # Time-based flush: don't hold a partial batch back for long
+                self.cut()
+                continue
+            if batch is None:
+                return
+            self.queued -= len(batch)
+            self.rows += await self.upload(batch)
+            print(f"Sheet writer: {self.rows} leads in '{SHEET_NAME}' after {time.time() - started:.0f}s")
+            # Whatever piled up during the upload goes out next
+            if len(self.buffer) >= self.batch_size:
+                self.cut()
+
+    async def upload(self, batch):
+        """Upload one batch, retrying with backoff; on final failure the batch goes back in the buffer."""
+        for attempt in range(UPLOAD_RETRIES + 1):
+            try:
+                return await asyncio.to_thread(update_google_sheet, batch)
+            except Exception as e:
+                if attempt == UPLOAD_RETRIES:
+                    self.buffer = batch + self.buffer
+                    raise
+                # Re-running is safe: rows that did land are found by the dedup index
+                delay = random.uniform(0, min(sheet_writer.MAX_DELAY, sheet_writer.BASE_DELAY * 2 ** attempt))
+                print(f"  ⚠️  Sheet upload failed ({e}), retrying in {delay:.1f}s (attempt {attempt + 1}/{UPLOAD_RETRIES})")
+                await asyncio.sleep(delay)
+
+    async def put(self, item):
+        """queue.put that stops waiting, re-raising the writer's error, if the writer dies."""
+        size = len(item) if item else 0
+        self.queued += size
+        put = asyncio.ensure_future(self.queue.put(item))
+        await asyncio.wait({put, self.task}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            self.queued -= size
+            self.check()
+
+    async def close(self):
+        """Upload whatever is left and wait for the writer to finish. Returns rows added."""
+        try:
+            while self.buffer:
+                await self.put(self.buffer)
+                self.buffer = []
+            await self.put(None)
+            await self.task
+        except Exception:
+            self.report_failure()
+            raise
+        return self.rows
 
 async def main():
+    parser = argparse.ArgumentParser(description="Filter, probe and score leads, then upload them to Google Sheets")
+    parser.add_argument("--input", help="Leads file to process, JSON array or NDJSON (default: newest file in output/)")
+    parser.add_argument("--max-rating", type=float, default=lead_filter.DEFAULT_MAX_RATING, help=f"Keep leads rated below this (default: {lead_filter.DEFAULT_MAX_RATING})")
+    parser.add_argument("--max-reviews", type=int, default=lead_filter.DEFAULT_MAX_REVIEWS, help=f"Keep leads with fewer reviews than this (default: {lead_filter.DEFAULT_MAX_REVIEWS})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help=f"Number of browser pages probing in parallel (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--probe-mode", choices=["browser", "http-first"], default="browser", help="'browser' renders every site; 'http-first' fetches raw HTML and only falls back to the browser for blocked or JS-rendered sites")
+    parser.add_argument("--http-concurrency", type=int, default=DEFAULT_HTTP_CONCURRENCY, help=f"Parallel HTTP fetches in http-first mode (default: {DEFAULT_HTTP_CONCURRENCY})")
+    parser.add_argument("--skip-preflight", action="store_true", help="Send every website to the prober without the DNS/TCP liveness check (e.g. behind an HTTP-only proxy)")
+    parser.add_argument("--preflight-concurrency", type=int, default=preflight.DEFAULT_CONCURRENCY, help=f"Parallel DNS/TCP checks (default: {preflight.DEFAULT_CONCURRENCY})")
+    parser.add_argument("--preflight-ttl-hours", type=float, default=probe_cache.DEFAULT_PREFLIGHT_TTL_HOURS, help=f"Reuse cached DNS/TCP verdicts younger than this many hours (default: {probe_cache.DEFAULT_PREFLIGHT_TTL_HOURS})")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run: skip leads already in its probe journal")
+    parser.add_argument("--flush-every", type=int, default=DEFAULT_FLUSH_EVERY, help=f"Upload scored leads to the sheet in batches of this size while probing continues; 0 uploads once at the end (default: {DEFAULT_FLUSH_EVERY})")
+    parser.add_argument("--flush-seconds", type=float, default=DEFAULT_FLUSH_SECONDS, help=f"Also upload a partial batch after this many seconds (default: {DEFAULT_FLUSH_SECONDS})")
+    parser.add_argument("--shards", type=int, default=1, help="Worker processes to split probing across, each with its own browser and --concurrency pages (default: 1)")
+    parser.add_argument("--cache-ttl-days", type=float, default=probe_cache.DEFAULT_TTL_DAYS, help=f"Reuse cached probe results younger than this many days (default: {probe_cache.DEFAULT_TTL_DAYS})")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached probe results and re-probe every website")
+    args = parser.parse_args()
+    
     # 1. Input Data
-    input_file = get_latest_file()
+    input_file = args.input or get_latest_file()
     if not input_file:
         print("No input file found in output/ directory.")
         return
     
     print(f"Reading from: {input_file}")
-    with open(input_file, 'r') as f:
-        leads = json.load(f)
+    raw_count = {'total': 0}
     
-    print(f"Total raw leads: {len(leads)}")
+    def counted(leads):
+        for lead in leads:
+            raw_count['total'] += 1
+            yield lead
     
-    # 2. Filtering
-    filtered_leads = filter_leads(leads)
-    print(f"Leads after filtering (Rating < 4.5, Reviews < 50, Valid Website): {len(filtered_leads)}")
+    # 2. Filtering (streamed: only leads that pass are kept in memory)
+    filtered_leads = filter_leads(counted(iter_leads(input_file)), args.max_rating, args.max_reviews)
+    print(f"Total raw leads: {raw_count['total']}")
+    print(f"Leads after filtering (Rating < {args.max_rating}, Reviews < {args.max_reviews}, Valid Website): {len(filtered_leads)}")
     
     if not filtered_leads:
         print("No leads passed the filter.")
         return
         
-    # 3. Enrichment & Scoring
-    enriched_leads = await enrich_leads(filtered_leads)
+    # 3. Enrichment & Scoring (journaled so an interrupted run can --resume)
+    journal = probe_journal.journal_path(input_file)
+    # Uploads overlap with probing unless --flush-every 0
+    writer = SheetWriter(args.flush_every, args.flush_seconds).start() if args.flush_every > 0 else None
+    
+    enriched_leads = await enrich_leads(
+        filtered_leads, args.concurrency, args.probe_mode, args.http_concurrency,
+        shards=args.shards, cache_ttl_days=args.cache_ttl_days, refresh=args.refresh,
+        journal_path=journal, resume=args.resume, on_scored=writer.add if writer else None,
+        preflight_hosts=not args.skip_preflight, preflight_ttl_hours=args.preflight_ttl_hours,
+        preflight_concurrency=args.preflight_concurrency
+    )
     
     # 4. Google Sheet Update
-    update_google_sheet(enriched_leads)
+    if writer:
+        await writer.close()
+    else:
+        update_google_sheet(enriched_leads)
+    
+    # Everything is in the sheet; the next run starts fresh
+    probe_journal.remove_journal(journal)
 
 if __name__ == "__main__":
     asyncio.run(main())
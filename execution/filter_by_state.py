@@ -2,29 +2,34 @@
 """
 Filter leads to only include those where the company is in a specific state.
 Usage: python3 execution/filter_by_state.py input.json output.json "New Jersey"
+
+Input may be a JSON array or NDJSON; it is streamed, so file size does not matter.
 """
 
 import sys
-import json
+
+from lead_stream import iter_leads, write_leads
 
 def filter_by_company_state(input_file, output_file, target_state):
-    with open(input_file, 'r') as f:
-        leads = json.load(f)
+    # Stream leads through the filter so huge exports never sit in memory.
+    # The output is NDJSON if output_file ends in .ndjson/.jsonl, else a JSON array.
+    state = target_state.lower()
+    counts = {'total': 0}
     
-    # Filter leads where company_state matches target_state
-    filtered = []
-    for lead in leads:
-        company_state = lead.get('company_state')
-        if company_state and company_state.lower() == target_state.lower():
-            filtered.append(lead)
-    
-    print(f"Original leads: {len(leads)}")
-    print(f"Filtered leads (company in {target_state}): {len(filtered)}")
-    print(f"Filtered out: {len(leads) - len(filtered)}")
+    def matching_leads():
+        # Filter leads where company_state matches target_state
+        for lead in iter_leads(input_file):
+            counts['total'] += 1
+            company_state = lead.get('company_state')
+            if company_state and company_state.lower() == state:
+                yield lead
     
     # Save filtered results
-    with open(output_file, 'w') as f:
-        json.dump(filtered, f, indent=2)
+    kept = write_leads(output_file, matching_leads())
+    
+    print(f"Original leads: {counts['total']}")
+    print(f"Filtered leads (company in {target_state}): {kept}")
+    print(f"Filtered out: {counts['total'] - kept}")
     
     print(f"\nSaved filtered results to: {output_file}")
     
@@ -0,0 +1,80 @@
+"""
+Technology fingerprinting for lead websites.
+
+Signatures live in fingerprints.json as {category: {technology: [markers]}}.
+All markers are compiled into one Aho-Corasick automaton (pyahocorasick), so a
+single pass over the page reports every technology regardless of how many
+signatures the registry holds. Without pyahocorasick the markers are compiled
+into one prefix-trie regex instead, which is slower but finds the same matches.
+"""
+
+import os
+import re
+import json
+from functools import lru_cache
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+SIGNATURES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fingerprints.json")
+
+def load_signatures(path=SIGNATURES_FILE):
+    """Read the signature registry: {category: {technology: [markers]}}."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def build_trie_pattern(markers):
+    """Build a regex alternation for `markers`, factored on shared prefixes."""
+    trie = {}
+    for marker in markers:
+        node = trie
+        for char in marker:
+            node = node.setdefault(char, {})
+        node[''] = {}  # end of marker
+
+    def to_pattern(node):
+        ends_here = '' in node
+        branches = [re.escape(char) + to_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if ends_here:
+            # Longer markers are tried first; the shorter one still matches if they fail
+            return '(?:' + body + ')?'
+        return body
+
+    return to_pattern(trie)
+
+@lru_cache(maxsize=None)
+def load_matcher(path=SIGNATURES_FILE):
+    """Compile the registry at `path` into a function yielding (category, technology) hits.
+
+    The matcher expects lowercased text: one lowercase copy of the page is far
+    cheaper than case-insensitive matching in either engine.
+    """
+    lookup = {}
+    for category, technologies in load_signatures(path).items():
+        for technology, markers in technologies.items():
+            for marker in markers:
+                lookup[marker.lower()] = (category, technology)
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for marker, hit in lookup.items():
+            automaton.add_word(marker, hit)
+        automaton.make_automaton()
+        return lambda text: (hit for _, hit in automaton.iter(text))
+
+    # Zero-width lookahead so overlapping and nested markers are all reported
+    pattern = re.compile('(?=(' + build_trie_pattern(lookup) + '))')
+    return lambda text: (lookup[match.group(1)] for match in pattern.finditer(text))
+
+def scan(text, path=SIGNATURES_FILE):
+    """Return {category: set of technologies} found anywhere in `text`."""
+    matcher = load_matcher(path)
+    found = {}
+    for category, technology in matcher(text.lower()):
+        found.setdefault(category, set()).add(technology)
+    return found
@@ -0,0 +1,56 @@
+"""
+Split a Google Maps query into geographic tiles.
+
+Google Maps returns at most a few hundred places per search, so a query like
+"Senior Living in New Jersey" silently stops well short of every match. The
+planner rewrites it as one query per smaller area ("Senior Living in Bergen
+County, NJ", ...) whose results are merged afterwards. Counties for the
+regions below are built in; any other split (cities, ZIP codes) comes from a
+tiles file with one area per line.
+"""
+
+# Region -> tiles covering it. Keys are lowercase; aliases map onto them.
+REGION_TILES = {
+    'new jersey': [f"{county} County, NJ" for county in [
+        'Atlantic', 'Bergen', 'Burlington', 'Camden', 'Cape May', 'Cumberland', 'Essex',
+        'Gloucester', 'Hudson', 'Hunterdon', 'Mercer', 'Middlesex', 'Monmouth', 'Morris',
+        'Ocean', 'Passaic', 'Salem', 'Somerset', 'Sussex', 'Union', 'Warren',
+    ]],
+}
+REGION_ALIASES = {'nj': 'new jersey'}
+
+def split_query(query):
+    """'Senior Living in New Jersey' -> ('Senior Living', 'New Jersey'); no ' in ' -> (query, '')."""
+    term, sep, location = query.rpartition(' in ')
+    if not sep:
+        return query.strip(), ''
+    return term.strip(), location.strip()
+
+def region_tiles(location):
+    """Built-in tiles for a region name, or None if there are none."""
+    key = location.strip().lower().removesuffix(', usa').removesuffix(', us')
+    return REGION_TILES.get(REGION_ALIASES.get(key, key))
+
+def load_tiles(path):
+    """One tile per line; blank lines and # comments are skipped."""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def plan_tiles(query, tiles=None):
+    """Return [{'tile', 'query'}] covering `query`.
+
+    `tiles` defaults to the built-in tiles for the query's location; raises
+    ValueError if there are none.
+    """
+    term, location = split_query(query)
+    if tiles is None:
+        tiles = region_tiles(location) if location else None
+        if not tiles:
+            raise ValueError(f"No built-in tiles for '{location or query}'; pass --tiles or --tiles-file")
+
+    plan, seen = [], set()
+    for tile in tiles:
+        if tile.lower() not in seen:
+            seen.add(tile.lower())
+            plan.append({'tile': tile, 'query': f"{term} in {tile}"})
+    return plan
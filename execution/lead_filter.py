@@ -0,0 +1,100 @@
+"""
+Columnar lead filter.
+
+Google Maps (Apify), Leads Finder and Outscraper dumps name the same fields
+differently. Each chunk of leads is mapped to canonical columns once, and the
+rating, review and website predicates are applied as boolean masks over whole
+columns instead of per-lead try/except conversions.
+"""
+
+from itertools import islice, repeat
+
+import numpy as np
+import pandas as pd
+
+# Canonical column -> source keys in priority order (first non-empty wins)
+CANONICAL_FIELDS = {
+    'name': ['title', 'name', 'company_name'],
+    'website': ['website', 'company_website', 'site'],
+    'phone': ['phone', 'phoneUnformatted'],
+    'rating': ['totalScore', 'rating'],
+    'reviews': ['reviewsCount', 'reviews'],
+}
+
+DEFAULT_MAX_RATING = 4.5
+DEFAULT_MAX_REVIEWS = 50
+CHUNK_SIZE = 100_000
+
+def canonical_value(lead, field, default=None):
+    """Value of a canonical field for a single lead, whatever its source schema."""
+    for key in CANONICAL_FIELDS[field]:
+        value = lead.get(key)
+        if value is not None and value != '':
+            return value
+    return default
+
+def is_missing(column):
+    """Mask of null or empty-string cells in an object column (JSON has no NaN)."""
+    return (column == None) | (column == '')  # noqa: E711 - elementwise, not identity
+
+def canonical_column(rows, field):
+    """Build one canonical column from an object array of lead dicts.
+
+    The first source key is read for every lead; later keys are only read for
+    the rows that are still missing a value. Reads go through map(dict.get)
+    so no Python bytecode runs per lead.
+    """
+    keys = CANONICAL_FIELDS[field]
+    column = np.fromiter(map(dict.get, rows, repeat(keys[0])), dtype=object, count=len(rows))
+    for key in keys[1:]:
+        missing = np.flatnonzero(is_missing(column))
+        if not len(missing):
+            break
+        column[missing] = np.fromiter(map(dict.get, rows[missing], repeat(key)), dtype=object, count=len(missing))
+    return column
+
+def to_number(column):
+    """Parse an object column to float; blanks and junk become NaN."""
+    try:
+        # Fast path: dumps usually hold JSON numbers and nulls only
+        return column.astype(float)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(column), errors='coerce').to_numpy(dtype=float)
+
+def as_rows(leads):
+    """Wrap a list of lead dicts in an object array for vectorized indexing."""
+    rows = np.empty(len(leads), dtype=object)
+    rows[:] = leads
+    return rows
+
+def filter_mask(rows, max_rating=DEFAULT_MAX_RATING, max_reviews=DEFAULT_MAX_REVIEWS):
+    """Boolean mask of leads (see as_rows) that pass the filter.
+
+    A lead needs a website. Rating and reviews must be below the thresholds
+    when present; missing or unparseable values are kept (opportunity).
+    """
+    website = canonical_column(rows, 'website')
+    has_website = ~is_missing(website) & (website != False)
+
+    rating = to_number(canonical_column(rows, 'rating'))
+    rating_ok = np.isnan(rating) | (rating < max_rating)
+
+    reviews = to_number(canonical_column(rows, 'reviews'))
+    reviews_ok = np.isnan(reviews) | (reviews < max_reviews)
+
+    return has_website & rating_ok & reviews_ok
+
+def filter_leads(leads, max_rating=DEFAULT_MAX_RATING, max_reviews=DEFAULT_MAX_REVIEWS, chunk_size=CHUNK_SIZE):
+    """Return the leads that pass the filter, in input order.
+
+    `leads` can be any iterable (including a lead stream); it is consumed in
+    chunks so memory is bounded by the chunk plus the leads that pass.
+    """
+    leads = iter(leads)
+    filtered = []
+    while True:
+        chunk = list(islice(leads, chunk_size))
+        if not chunk:
+            return filtered
+        rows = as_rows(chunk)
+        filtered.extend(rows[filter_mask(rows, max_rating, max_reviews)].tolist())
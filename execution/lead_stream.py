@@ -0,0 +1,55 @@
+"""
+Streaming read/write of lead dumps.
+
+Scrape exports can run to hundreds of MB, so leads are parsed one at a time
+from either a JSON array (via ijson) or newline-delimited JSON, and written
+back out one at a time. Memory stays flat regardless of file size.
+"""
+
+import json
+import ijson
+
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+def is_ndjson(path):
+    return path.lower().endswith(NDJSON_EXTENSIONS)
+
+def iter_leads(path):
+    """Yield leads from a JSON array or NDJSON file without loading it whole."""
+    with open(path, 'rb') as f:
+        # Sniff the first non-whitespace byte: '[' means a JSON array
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+
+        if first == b'[':
+            yield from ijson.items(f, 'item', use_float=True)
+            return
+
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def write_leads(path, leads):
+    """Stream leads to `path` and return how many were written.
+
+    .ndjson/.jsonl paths get one lead per line; anything else gets a JSON
+    array with one lead per line.
+    """
+    count = 0
+    with open(path, 'w') as f:
+        if is_ndjson(path):
+            for lead in leads:
+                f.write(json.dumps(lead) + '\n')
+                count += 1
+            return count
+
+        f.write('[')
+        for lead in leads:
+            f.write(',\n' if count else '\n')
+            f.write(json.dumps(lead))
+            count += 1
+        f.write('\n]\n')
+    return count
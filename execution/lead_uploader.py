@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Upload a lead dump to Google Sheets using a declarative per-source mapping.
+
+Each source in SOURCES says which tab it goes to, which lead keys become
+which columns (in order, with an optional transform), and how it is written:
+'append' adds rows below the existing data through the chunked, resumable
+bulk writer (header only on an empty tab); 'sync' diffs against the tab and
+only writes new or changed rows. Rows are produced by a generator straight
+from the streamed dump, without pandas: appends hold only the chunks in
+flight, syncs only the rows they write. Sources without a fixed column list
+read the dump twice, the first time just to collect its keys.
+
+update_gsheet.py, update_gsheet_leads_finder.py, update_gsheet_google_maps.py
+and update_gsheet_outscraper.py are thin wrappers around upload() kept for
+their existing command lines.
+
+Usage:
+    python execution/lead_uploader.py output/leads.json --source outscraper --sheet "NJ Dentists"
+    python execution/lead_uploader.py output/leads.json --source generic --resume
+"""
+
+import sys
+import itertools
+import argparse
+from dotenv import load_dotenv
+from sheets_client import SPREADSHEET_ID, require_config, get_sheets
+from lead_stream import iter_leads
+from sheet_sync import sync_sheet
+import sheet_writer
+
+load_dotenv()
+
+def phone_text(value):
+    """Keep phone numbers as text: a leading ' stops Sheets parsing them as numbers or formulas."""
+    return f"'{value}" if value else ''
+
+# Source -> mapping spec.
+#   columns: [(header, lead key or None for a blank column, transform or None)],
+#            or None to use every key found in the dump (first `leading` keys first)
+#   mode:    'append' (chunked bulk writer) or 'sync' (diff against the tab)
+SOURCES = {
+    'generic': {
+        'sheet': 'Sheet1',
+        'columns': None,
+        'mode': 'append',
+    },
+    'leads_finder': {
+        'sheet': 'Senior Living Decision Makers NJ',
+        'columns': None,
+        'leading': ['name', 'email', 'phone', 'website', 'address', 'city', 'state', 'zip'],
+        'mode': 'append',
+    },
+    'google_maps': {
+        'sheet': 'google maps new jersey senior living',
+        'columns': [
+            ('name', 'title', None),
+            ('email', None, None),
+            ('phone', 'phone', None),
+            ('website', 'website', None),
+            ('address', 'address', None),
+            ('city', 'city', None),
+            ('state', 'state', None),
+            ('zip', 'postalCode', None),
+            ('rating', 'totalScore', None),
+            ('reviews', 'reviewsCount', None),
+            # Stable id so re-runs update rows in place
+            ('place_id', 'placeId', None),
+        ],
+        'mode': 'sync',
+    },
+    'outscraper': {
+        'sheet': None,  # given with --sheet
+        'columns': [
+            ('Name', 'name', None),
+            ('Address', 'full_address', None),
+            ('Phone', 'phone', phone_text),
+            ('Website', 'site', None),
+            ('Rating', 'rating', None),
+            ('Reviews', 'reviews', None),
+            ('Email', 'email_1', None),
+            ('Email 2', 'email_2', None),
+            ('Facebook', 'facebook', None),
+            ('Instagram', 'instagram', None),
+            ('LinkedIn', 'linkedin', None),
+            ('place_id', 'place_id', None),
+        ],
+        'mode': 'sync',
+    },
+}
+
+def cell(value):
+    """Lead value -> sheet cell text. Missing values are blank; nested data is stringified."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value != value:  # NaN
+        return ''
+    return str(value)
+
+def all_keys_columns(leads_file, leading=()):
+    """Columns for a schema-less source: every key in the dump, in first-seen order."""
+    keys = dict.fromkeys(leading)
+    seen = set()
+    for lead in iter_leads(leads_file):
+        for key in lead:
+            if key not in seen:
+                seen.add(key)
+                keys.setdefault(key, None)
+    # Leading columns only count if some lead actually has them
+    return [(key, key, None) for key in keys if key in seen]
+
+def resolve_columns(spec, leads_file):
+    if spec['columns'] is not None:
+        return spec['columns']
+    return all_keys_columns(leads_file, spec.get('leading', ()))
+
+def iter_rows(leads_file, columns):
+    """Yield one row of cell text per lead, streaming the dump."""
+    for lead in iter_leads(leads_file):
+        row = []
+        for _, key, transform in columns:
+            value = lead.get(key) if key else None
+            if transform:
+                value = transform(value)
+            row.append(cell(value))
+        yield row
+
+def upload(leads_file, source, sheet_name=None, overwrite=False, resume=False, chunk_rows=sheet_writer.CHUNK_ROWS):
+    """Upload `leads_file` as `source` (see SOURCES). Exits with status 1 on failure."""
+    require_config()
+    spec = SOURCES[source]
+    sheet_name = sheet_name or spec['sheet']
+    if not sheet_name:
+        raise ValueError(f"Source '{source}' needs a sheet name")
+
+    try:
+        sheet = get_sheets()
+
+        columns = resolve_columns(spec, leads_file)
+        header = [name for name, _, _ in columns]
+        rows = iter_rows(leads_file, columns)
+        first = next(rows, None)
+        if first is None:
+            print("No leads to upload.")
+            return
+        rows = itertools.chain([first], rows)
+
+        if spec['mode'] == 'sync' and not overwrite:
+            # Only new or changed rows are written; manual columns are kept
+            # Placeholder columns (no lead key) are laid out on new rows only, so hand-filled values stay
+            placeholders = [name for name, key, _ in columns if key is None]
+            stats = sync_sheet(sheet, SPREADSHEET_ID, sheet_name, header, rows, insert_only=placeholders)
+            print(f"✅ {stats['inserted']} inserted, {stats['updated']} updated, {stats['unchanged']} unchanged "
+                  f"({stats['cells']} cells written) in '{sheet_name}' sheet.")
+        else:
+            if overwrite:
+                # Clean slate, then the header goes back in as on an empty tab
+                sheet.values().clear(spreadsheetId=SPREADSHEET_ID, range=f"'{sheet_name}'!A1:ZZ").execute()
+            checkpoint = sheet_writer.checkpoint_path(leads_file, sheet_name)
+            stats = sheet_writer.write_rows(
+                sheet, SPREADSHEET_ID, sheet_name, rows,
+                header=header, checkpoint=checkpoint, resume=resume and not overwrite, max_rows=chunk_rows)
+            print(f"✅ {stats['cells']} cells updated in '{sheet_name}' sheet "
+                  f"({stats['rows'] / max(stats['seconds'], 1e-6):.0f} rows/s).")
+        print(f"Link: https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}")
+
+    except Exception as e:
+        print(f"Error updating sheet: {e}", file=sys.stderr)
+        if spec['mode'] == 'append' and not overwrite:
+            print("Re-run with --resume to continue from the last written chunk.", file=sys.stderr)
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload a lead dump to Google Sheets")
+    parser.add_argument("file", help="JSON or NDJSON file of leads")
+    parser.add_argument("--source", choices=sorted(SOURCES), default="generic", help="Column mapping to use (default: generic, every key as a column)")
+    parser.add_argument("--sheet", help="Tab to write to (default: the source's own tab)")
+    parser.add_argument("--overwrite", action="store_true", help="Clear the tab and rewrite every row")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted append from its last written chunk")
+    parser.add_argument("--chunk-rows", type=int, default=sheet_writer.CHUNK_ROWS, help="Maximum rows per write request")
+
+    args = parser.parse_args()
+
+    upload(args.file, args.source, args.sheet, args.overwrite, args.resume, args.chunk_rows)
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,14 @@
-import os
 import sys
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from dotenv import load_dotenv
+from sheets_client import SPREADSHEET_ID, require_config, get_sheets
 
 load_dotenv()
 
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
-CREDENTIALS_FILE = os.getenv("GOOGLE_SHEETS_CREDENTIALS_JSON")
-
 def list_sheets():
-    if not SPREADSHEET_ID or not CREDENTIALS_FILE:
-        raise ValueError("GOOGLE_SPREADSHEET_ID or GOOGLE_SHEETS_CREDENTIALS_JSON not set in .env")
+    require_config()
 
     try:
-        creds = service_account.Credentials.from_service_account_file(
-            CREDENTIALS_FILE, scopes=SCOPES)
-        service = build('sheets', 'v4', credentials=creds)
-        sheet = service.spreadsheets()
+        sheet = get_sheets()
 
         spreadsheet = sheet.get(spreadsheetId=SPREADSHEET_ID).execute()
         sheets = spreadsheet.get('sheets', [])
@@ -0,0 +1,44 @@
+"""
+Wait for async Outscraper requests without blocking the event loop.
+
+Both the contact lookups (contact_enricher) and tiled Maps scrapes
+(scrape_outscraper) submit requests with async_request=True and then poll the
+request archive. This is the one place that decides when such a request is
+done and whether it succeeded.
+"""
+
+import time
+import asyncio
+
+POLL_SECONDS = 5
+TIMEOUT_SECONDS = 60 * 60
+# Transient archive errors tolerated in a row, as the SDK's own waiter does
+ARCHIVE_RETRIES = 1
+
+async def poll_request(client, request_id):
+    """Poll `request_id` until it finishes and return its archive.
+
+    Raises if the request ends with any status other than Success, stays
+    pending past TIMEOUT_SECONDS, or the archive can't be fetched after
+    ARCHIVE_RETRIES retries.
+    """
+    deadline = time.time() + TIMEOUT_SECONDS
+    failures = 0
+    while True:
+        await asyncio.sleep(POLL_SECONDS)
+        try:
+            archive = await asyncio.to_thread(client.get_request_archive, request_id)
+        except Exception:
+            failures += 1
+            if failures > ARCHIVE_RETRIES:
+                raise
+            continue
+        failures = 0
+
+        status = archive.get('status')
+        if status == 'Success':
+            return archive
+        if status != 'Pending':
+            raise RuntimeError(f"request {request_id} finished with status {status!r}")
+        if time.time() > deadline:
+            raise TimeoutError(f"request {request_id} still pending after {TIMEOUT_SECONDS}s")
@@ -0,0 +1,108 @@
+"""
+Persistent per-domain cache of website probe results.
+
+Probes are keyed by normalized domain so overlapping scrapes (the same business
+found again by a later query) reuse earlier verdicts instead of re-opening the
+site. Entries older than the TTL are treated as misses. DNS/TCP pre-flight verdicts
+are cached separately per host, with their own (shorter) TTL.
+"""
+
+import os
+import json
+import time
+import sqlite3
+
+from domains import normalize_domain
+
+CACHE_PATH = os.getenv("PROBE_CACHE_PATH", os.path.join(".cache", "probe_cache.sqlite"))
+DEFAULT_TTL_DAYS = 7
+DEFAULT_PREFLIGHT_TTL_HOURS = 24
+
+def open_cache(path=CACHE_PATH):
+    """Open (creating if needed) the cache database."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Shard processes write concurrently; wait for the lock rather than fail
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS probes (
+            domain TEXT PRIMARY KEY,
+            pixel INTEGER NOT NULL,
+            chat INTEGER NOT NULL,
+            signals TEXT NOT NULL,
+            http_status INTEGER,
+            final_url TEXT,
+            probed_at REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS preflight (
+            host TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            checked_at REAL NOT NULL
+        )
+    """)
+    return conn
+
+def get_probe(conn, website, ttl_days=DEFAULT_TTL_DAYS):
+    """Return the cached probe for `website`'s domain, or None if missing or expired."""
+    domain = normalize_domain(website)
+    if not domain:
+        return None
+
+    row = conn.execute(
+        "SELECT signals, http_status, final_url, probed_at FROM probes WHERE domain = ?",
+        (domain,)
+    ).fetchone()
+    if not row:
+        return None
+
+    signals, http_status, final_url, probed_at = row
+    if time.time() - probed_at > ttl_days * 86400:
+        return None
+
+    return {
+        'signals': {category: set(names) for category, names in json.loads(signals).items()},
+        'http_status': http_status,
+        'final_url': final_url,
+        'probed_at': probed_at,
+    }
+
+def put_probe(conn, website, probe):
+    """Store a probe result. Probes that never got an HTTP response are not cached."""
+    domain = normalize_domain(website)
+    if not domain or probe.get('http_status') is None:
+        return
+
+    signals = probe.get('signals', {})
+    conn.execute(
+        "INSERT OR REPLACE INTO probes (domain, pixel, chat, signals, http_status, final_url, probed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            domain,
+            int(bool(signals.get('pixel'))),
+            int(bool(signals.get('chat'))),
+            json.dumps({category: sorted(names) for category, names in signals.items()}),
+            probe.get('http_status'),
+            probe.get('final_url'),
+            probe.get('probed_at', time.time()),
+        )
+    )
+    conn.commit()
+
+def get_preflight(conn, host, ttl_hours=DEFAULT_PREFLIGHT_TTL_HOURS):
+    """Return the cached pre-flight status for `host`, or None if missing or expired."""
+    row = conn.execute("SELECT status, checked_at FROM preflight WHERE host = ?", (host,)).fetchone()
+    if not row or time.time() - row[1] > ttl_hours * 3600:
+        return None
+    return row[0]
+
+def put_preflight(conn, statuses):
+    """Store {host: status} pre-flight results."""
+    now = time.time()
+    conn.executemany(
+        "INSERT OR REPLACE INTO preflight (host, status, checked_at) VALUES (?, ?, ?)",
+        [(host, status, now) for host, status in statuses.items()]
+    )
+    conn.commit()
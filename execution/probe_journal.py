@@ -0,0 +1,65 @@
+"""
+Append-only journal of per-lead probe results for filter_and_score.
+
+Every probe is appended as one JSON line the moment it finishes, so a run that
+dies part-way (browser crash, OOM, Ctrl-C) can be resumed with --resume and
+only the leads missing from the journal are probed again.
+"""
+
+import os
+import json
+
+JOURNAL_DIR = os.path.join(".cache", "journals")
+
+def journal_path(input_file):
+    """Journal location for a given input file."""
+    name = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(JOURNAL_DIR, f"{name}.journal")
+
+def start_journal(path, resume=False):
+    """Prepare the journal: kept as-is when resuming, emptied otherwise."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not resume or not os.path.exists(path):
+        open(path, 'w').close()
+        return
+
+    # Terminate a torn last line so new entries start on a line of their own
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+def append_probe(path, index, website, probe):
+    """Append one probe result. One write per line, so concurrent shard processes don't interleave."""
+    entry = {
+        'index': index,
+        'website': website,
+        'probe': {**probe, 'signals': {category: sorted(names) for category, names in probe['signals'].items()}},
+    }
+    with open(path, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+def read_journal(path):
+    """Return {index: (website, probe)} for every complete line in the journal."""
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn last line from a crash mid-write
+                continue
+            probe = entry['probe']
+            probe['signals'] = {category: set(names) for category, names in probe['signals'].items()}
+            entries[entry['index']] = (entry['website'], probe)
+    return entries
+
+def remove_journal(path):
+    """Drop the journal once its results are safely in the sheet."""
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,98 @@
+"""
+Coalesce per-cell sheet edits into as few rectangular ranges as possible.
+
+The enrichment scripts produce edits cell by cell (a few columns on scattered
+rows). Sent as-is, every cell becomes its own ValueRange and a few thousand
+leads make a huge, slow batchUpdate. Here adjacent cells in a row are merged
+into column runs, identical runs on consecutive rows are stacked into
+rectangles, and the result is split into batches that stay well inside the
+API's request limits. Only the edited cells are covered, so nothing else in
+the tab is overwritten.
+"""
+
+from sheet_sync import column_letter
+from sheet_writer import execute_with_retry
+
+MAX_RANGES_PER_BATCH = 1000
+MAX_CELLS_PER_BATCH = 50_000
+
+def row_runs(columns):
+    """Sorted column indexes -> [(first, last)] runs of adjacent columns."""
+    runs = []
+    for column in columns:
+        if runs and column == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], column)
+        else:
+            runs.append((column, column))
+    return runs
+
+def plan_ranges(edits):
+    """Merge {(row, column): value} edits into rectangles.
+
+    Rows are 1-based sheet rows, columns 0-based indexes. Returns a list of
+    (first_row, first_column, last_row, last_column) rectangles in row order.
+    """
+    by_row = {}
+    for row, column in edits:
+        by_row.setdefault(row, []).append(column)
+
+    # Column runs per row, then stack the same run across consecutive rows
+    open_rects = {}
+    rects = []
+    for row in sorted(by_row):
+        runs = row_runs(sorted(by_row[row]))
+        still_open = {}
+        for run in runs:
+            rect = open_rects.get(run)
+            if rect and rect[2] == row - 1:
+                rect[2] = row
+            else:
+                rect = [row, run[0], row, run[1]]
+                rects.append(rect)
+            still_open[run] = rect
+        open_rects = still_open
+    return [tuple(rect) for rect in rects]
+
+def to_value_ranges(edits, rects, sheet_name):
+    """ValueRanges for batchUpdate, one per rectangle."""
+    data = []
+    for first_row, first_col, last_row, last_col in rects:
+        data.append({
+            'range': f"'{sheet_name}'!{column_letter(first_col)}{first_row}:{column_letter(last_col)}{last_row}",
+            'values': [[edits[(row, col)] for col in range(first_col, last_col + 1)]
+                       for row in range(first_row, last_row + 1)],
+        })
+    return data
+
+def split_batches(data, max_ranges=MAX_RANGES_PER_BATCH, max_cells=MAX_CELLS_PER_BATCH):
+    """Split ValueRanges into batches capped by range count and cell count."""
+    batches = [[]]
+    cells = 0
+    for value_range in data:
+        size = sum(len(row) for row in value_range['values'])
+        if batches[-1] and (len(batches[-1]) >= max_ranges or cells + size > max_cells):
+            batches.append([])
+            cells = 0
+        batches[-1].append(value_range)
+        cells += size
+    return [batch for batch in batches if batch]
+
+def write_edits(sheet, spreadsheet_id, sheet_name, edits, value_input_option='RAW'):
+    """Apply {(row, column): value} edits with the fewest ranges and batches.
+
+    Returns {'cells', 'ranges', 'batches'}.
+    """
+    if not edits:
+        return {'cells': 0, 'ranges': 0, 'batches': 0}
+
+    data = to_value_ranges(edits, plan_ranges(edits), sheet_name)
+    batches = split_batches(data)
+    for batch in batches:
+        execute_with_retry(sheet.values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={'valueInputOption': value_input_option, 'data': batch}
+        ))
+
+    print(f"{len(edits)} cell edits sent as {len(data)} ranges in {len(batches)} batch(es) "
+          f"({len(edits) - len(data)} ranges saved)")
+    return {'cells': len(edits), 'ranges': len(data), 'batches': len(batches)}
@@ -1,32 +1,29 @@
-import os
 import sys
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+import argparse
 from dotenv import load_dotenv
+from sheets_client import SPREADSHEET_ID, require_config, get_sheets
+import sheet_mirror
 
 load_dotenv()
 
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
-CREDENTIALS_FILE = os.getenv("GOOGLE_SHEETS_CREDENTIALS_JSON")
-
-def read_sheet(sheet_name, max_rows=10):
-    if not SPREADSHEET_ID or not CREDENTIALS_FILE:
-        raise ValueError("GOOGLE_SPREADSHEET_ID or GOOGLE_SHEETS_CREDENTIALS_JSON not set in .env")
-
+def read_sheet(sheet_name, max_rows=10, from_mirror=False):
     try:
-        creds = service_account.Credentials.from_service_account_file(
-            CREDENTIALS_FILE, scopes=SCOPES)
-        service = build('sheets', 'v4', credentials=creds)
-        sheet = service.spreadsheets()
+        if from_mirror:
+            # Offline: straight from the local copy, no API calls
+            conn = sheet_mirror.open_mirror()
+            header, rows = sheet_mirror.read_tab(conn, sheet_name)
+            values = ([header] + [cells for _, cells in rows[:max_rows - 1]]) if header else []
+        else:
+            require_config()
+            sheet = get_sheets()
 
-        # Read the data
-        result = sheet.values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range=f"'{sheet_name}'!A1:Z{max_rows}"
-        ).execute()
-        
-        values = result.get('values', [])
+            # Read the data
+            result = sheet.values().get(
+                spreadsheetId=SPREADSHEET_ID,
+                range=f"'{sheet_name}'!A1:Z{max_rows}"
+            ).execute()
+            
+            values = result.get('values', [])
         
         if not values:
             print(f"No data found in sheet '{sheet_name}'")
@@ -47,6 +44,10 @@ def read_sheet(sheet_name, max_rows=10):
         sys.exit(1)
 
 if __name__ == "__main__":
-    sheet_name = sys.argv[1] if len(sys.argv) > 1 else "Lead Finder"
-    max_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10
-    read_sheet(sheet_name, max_rows)
+    parser = argparse.ArgumentParser(description="Print the first rows of a Google Sheet tab")
+    parser.add_argument("sheet_name", nargs="?", default="Lead Finder", help="Tab to read (default: Lead Finder)")
+    parser.add_argument("max_rows", nargs="?", type=int, default=10, help="Rows to print, including the header (default: 10)")
+    parser.add_argument("--from-mirror", action="store_true", help="Read from the local mirror (see sheet_mirror.py) instead of the live sheet")
+    
+    args = parser.parse_args()
+    read_sheet(args.sheet_name, args.max_rows, args.from_mirror)
@@ -1,16 +1,42 @@
 import os
 import sys
 import json
+import asyncio
 import argparse
 from datetime import datetime
 from outscraper import ApiClient
 from dotenv import load_dotenv
+import geo_tiles
+import outscraper_requests
 
 load_dotenv()
 
 OUTSCRAPER_API_KEY = os.getenv("OUTSCRAPER_API_KEY")
 OUTPUT_DIR = "output"
 
+# Tiled scrapes: tile queries per Outscraper request, requests in flight at once
+DEFAULT_TILES_PER_REQUEST = 5
+DEFAULT_CONCURRENCY = 4
+
+def flatten(results):
+    """Outscraper returns a list of lists (one per query); flatten to one list of businesses."""
+    businesses = []
+    for result_set in results or []:
+        if isinstance(result_set, list):
+            businesses.extend(result_set)
+        else:
+            businesses.append(result_set)
+    return businesses
+
+def place_key(business):
+    """Identity of a place across overlapping tiles."""
+    return business.get('place_id') or business.get('google_id') or (business.get('name'), business.get('full_address'))
+
+def print_email_stats(businesses):
+    # Count emails (Outscraper returns email_1, email_2, email_3)
+    email_count = sum(1 for b in businesses if b.get('email_1'))
+    print(f"Found emails for {email_count} businesses ({email_count/max(len(businesses), 1)*100:.1f}%)")
+
 def scrape_google_maps(query, limit=100, enrich_emails=True, language="en", region="us"):
     """
     Scrape Google Maps using Outscraper API.
@@ -50,18 +76,10 @@ def scrape_google_maps(query, limit=100, enrich_emails=True, language="en", regi
         )
         
         # Flatten results (Outscraper returns list of lists)
-        businesses = []
-        for result_set in results:
-            if isinstance(result_set, list):
-                businesses.extend(result_set)
-            else:
-                businesses.append(result_set)
+        businesses = flatten(results)
         
         print(f"Successfully scraped {len(businesses)} businesses")
-        
-        # Count emails (Outscraper returns email_1, email_2, email_3)
-        email_count = sum(1 for b in businesses if b.get('email_1'))
-        print(f"Found emails for {email_count} businesses ({email_count/len(businesses)*100:.1f}%)")
+        print_email_stats(businesses)
         
         return businesses
         
@@ -69,6 +87,110 @@ def scrape_google_maps(query, limit=100, enrich_emails=True, language="en", regi
         print(f"Error during scraping: {e}", file=sys.stderr)
         raise
 
+async def run_tile_batch(client, batch, options, semaphore, progress):
+    """Submit one request for a batch of tile queries and poll it. Returns [(tile, places or None, error)]."""
+    async with semaphore:
+        try:
+            response = await asyncio.to_thread(
+                client.google_maps_search, [tile['query'] for tile in batch], async_request=True, **options)
+            archive = await outscraper_requests.poll_request(client, response['id'])
+        except Exception as e:
+            progress['done'] += len(batch)
+            print(f"  ❌ {len(batch)} tile(s) failed: {e}")
+            return [(tile, None, str(e)) for tile in batch]
+
+    # One result list per query, in query order
+    data = archive.get('data') or []
+    results = []
+    for index, tile in enumerate(batch):
+        places = data[index] if index < len(data) else []
+        results.append((tile, places if isinstance(places, list) else [places], None))
+    progress['done'] += len(batch)
+    print(f"  📦 {progress['done']}/{progress['total']} tiles scraped")
+    return results
+
+def merge_tiles(results, limit):
+    """Merge per-tile results in plan order, dropping places already seen. Returns (businesses, coverage)."""
+    businesses, seen, coverage = [], set(), []
+    for tile, places, error in results:
+        new = 0
+        for place in places or []:
+            key = place_key(place)
+            if key not in seen:
+                seen.add(key)
+                businesses.append(place)
+                new += 1
+        coverage.append({
+            'tile': tile['tile'],
+            'query': tile['query'],
+            'returned': len(places or []),
+            'new': new,
+            # A tile that filled its limit probably has more places than it returned
+            'saturated': bool(places) and len(places) >= limit,
+            'error': error,
+        })
+    return businesses, coverage
+
+async def scrape_tiles_async(client, plan, limit, options, concurrency, tiles_per_request):
+    batches = [plan[i:i + tiles_per_request] for i in range(0, len(plan), tiles_per_request)]
+    semaphore = asyncio.Semaphore(concurrency)
+    progress = {'done': 0, 'total': len(plan)}
+    print(f"Scraping {len(plan)} tiles in {len(batches)} request(s), {concurrency} at a time...")
+    
+    batch_results = await asyncio.gather(*(run_tile_batch(client, batch, options, semaphore, progress) for batch in batches))
+    return merge_tiles([result for results in batch_results for result in results], limit)
+
+def scrape_tiles(query, tiles=None, limit=100, enrich_emails=True, language="en", region="us",
+                 concurrency=DEFAULT_CONCURRENCY, tiles_per_request=DEFAULT_TILES_PER_REQUEST):
+    """
+    Scrape Google Maps one geographic tile at a time (see geo_tiles), concurrently.
+    
+    Args:
+        query: Search query (e.g., "Senior Living in New Jersey")
+        tiles: Areas to split the query into (default: built-in tiles for its region)
+        limit: Number of businesses to scrape per tile
+    
+    Returns:
+        (businesses deduplicated by place_id, per-tile coverage)
+    """
+    if not OUTSCRAPER_API_KEY:
+        raise ValueError("OUTSCRAPER_API_KEY not found in .env")
+    
+    client = ApiClient(api_key=OUTSCRAPER_API_KEY)
+    plan = geo_tiles.plan_tiles(query, tiles)
+    
+    print(f"Starting tiled Outscraper scrape...")
+    print(f"Query: {query}")
+    print(f"Tiles: {len(plan)} (limit {limit} each)")
+    print(f"Enrich Emails: {enrich_emails}")
+    
+    options = {
+        'limit': limit,
+        'language': language,
+        'region': region,
+        'enrichment': ['domains_service'] if enrich_emails else None,
+    }
+    businesses, coverage = asyncio.run(scrape_tiles_async(client, plan, limit, options, concurrency, tiles_per_request))
+    
+    print(f"Successfully scraped {len(businesses)} unique businesses")
+    print_email_stats(businesses)
+    return businesses, coverage
+
+def print_coverage(coverage):
+    print("\nCoverage by tile:")
+    for tile in coverage:
+        if tile['error']:
+            note = f"❌ {tile['error'][:60]}"
+        elif tile['saturated']:
+            note = "⚠️  hit the limit, may be truncated (split this tile further)"
+        else:
+            note = "✅"
+        print(f"  {tile['tile']:<32} {tile['returned']:>4} returned {tile['new']:>4} new  {note}")
+    
+    failed = sum(1 for tile in coverage if tile['error'])
+    saturated = sum(1 for tile in coverage if tile['saturated'])
+    print(f"{len(coverage) - failed - saturated}/{len(coverage)} tiles complete, {saturated} saturated, {failed} failed")
+
 def save_results(businesses, query_name):
     """Save results to JSON file in output directory."""
     # Create output directory if it doesn't exist
@@ -112,6 +234,11 @@ def main():
     parser.add_argument("--language", type=str, default="en", help="Language code (default: en)")
     parser.add_argument("--region", type=str, default="us", help="Region code (default: us)")
     parser.add_argument("--query-name", type=str, help="Custom name for output file (default: derived from query)")
+    parser.add_argument("--tiled", action="store_true", help="Split the query into the built-in tiles for its region (e.g. NJ counties); --limit then applies per tile")
+    parser.add_argument("--tiles", nargs="+", help="Split the query into these areas (e.g. 'Newark, NJ' '07030')")
+    parser.add_argument("--tiles-file", help="Split the query into the areas listed in this file, one per line")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help=f"Tiled: Outscraper requests in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--tiles-per-request", type=int, default=DEFAULT_TILES_PER_REQUEST, help=f"Tiled: tile queries per Outscraper request (default: {DEFAULT_TILES_PER_REQUEST})")
     
     args = parser.parse_args()
     
@@ -123,15 +250,32 @@ def main():
     else:
         query_name = args.query_name
     
+    tiles = args.tiles
+    if args.tiles_file:
+        tiles = geo_tiles.load_tiles(args.tiles_file)
+    
     try:
         # Scrape
-        businesses = scrape_google_maps(
-            query=args.query,
-            limit=args.limit,
-            enrich_emails=args.enrich_emails,
-            language=args.language,
-            region=args.region
-        )
+        if args.tiled or tiles:
+            businesses, coverage = scrape_tiles(
+                query=args.query,
+                tiles=tiles,
+                limit=args.limit,
+                enrich_emails=args.enrich_emails,
+                language=args.language,
+                region=args.region,
+                concurrency=args.concurrency,
+                tiles_per_request=args.tiles_per_request
+            )
+            print_coverage(coverage)
+        else:
+            businesses = scrape_google_maps(
+                query=args.query,
+                limit=args.limit,
+                enrich_emails=args.enrich_emails,
+                language=args.language,
+                region=args.region
+            )
         
         if not businesses:
             print("No businesses found. Try broadening your search query.")
@@ -143,7 +287,7 @@ def main():
         print(f"\n✅ Success! Next steps:")
         print(f"1. Review the results: cat {filepath} | jq '.[0]'")
         print(f"2. Filter & score: python3 execution/filter_and_score.py")
-        print(f"3. Or upload directly: python3 execution/update_gsheet_outscraper.py {filepath}")
+        print(f"3. Or upload directly: python3 execution/lead_uploader.py {filepath} --source outscraper --sheet \"<tab name>\"")
         
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
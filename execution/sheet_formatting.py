@@ -0,0 +1,174 @@
+"""
+Declarative, idempotent formatting for a gspread worksheet.
+
+A spec names the columns (by header) that get a dropdown and the text values
+that get a colour. The tab's current conditional-format rules and validation
+are read, compared with the spec, and whatever differs is fixed in a single
+spreadsheets.batchUpdate: stale or duplicated copies of our rules are deleted
+and the wanted rules added once, from row 2 down with no end row, so appended
+rows are covered without touching the rules. Running it again on an unchanged
+or merely longer tab sends nothing. Rules the spec doesn't describe are left
+alone.
+
+Spec shape:
+    {
+        'validation': [{'column': 'Outreach_Status', 'values': [...]}],
+        'highlights': [{'column': 'Lead_Score', 'equals': 'HOT LEAD',
+                        'background': (0, 1, 0), 'bold': True}],
+    }
+"""
+
+from sheet_sync import column_letter
+
+def column_range(sheet_id, column):
+    """Open-ended GridRange for one column from row 2 down (no endRowIndex, like I2:I)."""
+    return {
+        'sheetId': sheet_id,
+        'startRowIndex': 1,
+        'startColumnIndex': column,
+        'endColumnIndex': column + 1,
+    }
+
+def color(rgb):
+    red, green, blue = rgb
+    return {'red': red, 'green': green, 'blue': blue}
+
+def rule_key(rule):
+    """(column, condition type, values) of a single-column TEXT_EQ-style rule, else None."""
+    ranges = rule.get('ranges', [])
+    boolean = rule.get('booleanRule')
+    if len(ranges) != 1 or not boolean:
+        return None
+    grid = ranges[0]
+    if grid.get('endColumnIndex', 0) - grid.get('startColumnIndex', 0) != 1:
+        return None
+    condition = boolean.get('condition', {})
+    values = tuple(value.get('userEnteredValue') for value in condition.get('values', []))
+    return (grid.get('startColumnIndex'), condition.get('type'), values)
+
+def rule_signature(rule):
+    """Comparable form of a rule: key, row span and the format fields the spec sets."""
+    grid = rule['ranges'][0]
+    cell_format = rule['booleanRule'].get('format', {})
+    background = cell_format.get('backgroundColor', {})
+    return (
+        rule_key(rule),
+        grid.get('startRowIndex', 0),
+        grid.get('endRowIndex'),
+        tuple(round(background.get(channel, 0), 3) for channel in ('red', 'green', 'blue')),
+        bool(cell_format.get('textFormat', {}).get('bold')),
+    )
+
+def desired_rules(spec, sheet_id, columns):
+    rules = []
+    for highlight in spec.get('highlights', []):
+        if highlight['column'] not in columns:
+            continue
+        cell_format = {'backgroundColor': color(highlight['background'])}
+        if highlight.get('bold'):
+            cell_format['textFormat'] = {'bold': True}
+        rules.append({
+            'ranges': [column_range(sheet_id, columns[highlight['column']])],
+            'booleanRule': {
+                'condition': {'type': 'TEXT_EQ', 'values': [{'userEnteredValue': highlight['equals']}]},
+                'format': cell_format,
+            },
+        })
+    return rules
+
+def validation_rule(values):
+    return {
+        'condition': {'type': 'ONE_OF_LIST', 'values': [{'userEnteredValue': value} for value in values]},
+        'showCustomUi': True,
+    }
+
+def same_validation(current, wanted):
+    if not current:
+        return False
+    condition = current.get('condition', {})
+    return (condition.get('type') == wanted['condition']['type']
+            and condition.get('values') == wanted['condition']['values']
+            and bool(current.get('showCustomUi')) == wanted['showCustomUi'])
+
+def read_layout(worksheet):
+    """Return (header, last_row, existing conditional-format rules) in one request."""
+    title = worksheet.title
+    metadata = worksheet.spreadsheet.fetch_sheet_metadata(params={
+        'ranges': [f"'{title}'!1:1", f"'{title}'!A:A"],
+        'includeGridData': True,
+        'fields': 'sheets(properties.sheetId,conditionalFormats,data.rowData.values.formattedValue)',
+    })
+    tab = next(s for s in metadata['sheets'] if s['properties']['sheetId'] == worksheet.id)
+    header_data, column_data = (tab.get('data', []) + [{}, {}])[:2]
+
+    header_row = (header_data.get('rowData') or [{}])[0]
+    header = [cell.get('formattedValue', '') for cell in header_row.get('values', [])]
+
+    last_row = 1
+    for index, row in enumerate(column_data.get('rowData', []), start=1):
+        if any(cell.get('formattedValue') for cell in row.get('values', [])):
+            last_row = index
+    return header, last_row, tab.get('conditionalFormats', [])
+
+def read_validations(worksheet, cells):
+    """{a1: dataValidation or None} for a few sample cells."""
+    title = worksheet.title
+    metadata = worksheet.spreadsheet.fetch_sheet_metadata(params={
+        'ranges': [f"'{title}'!{cell}" for cell in cells],
+        'includeGridData': True,
+        'fields': 'sheets(properties.sheetId,data.rowData.values.dataValidation)',
+    })
+    tab = next(s for s in metadata['sheets'] if s['properties']['sheetId'] == worksheet.id)
+    found = {}
+    for cell, data in zip(cells, tab.get('data', [])):
+        values = ((data.get('rowData') or [{}])[0]).get('values') or [{}]
+        found[cell] = values[0].get('dataValidation')
+    return found
+
+def plan_requests(spec, sheet_id, header, existing, validations=None):
+    """batchUpdate requests that bring the tab in line with `spec` ([] if it already is)."""
+    columns = {name: index for index, name in enumerate(header) if name}
+    wanted = desired_rules(spec, sheet_id, columns)
+    wanted_keys = {rule_key(rule) for rule in wanted}
+
+    # Existing rules for the same column and condition are ours, however many copies stacked up
+    ours = [(index, rule) for index, rule in enumerate(existing) if rule_key(rule) in wanted_keys]
+    requests = []
+    if sorted(rule_signature(rule) for _, rule in ours) != sorted(rule_signature(rule) for rule in wanted):
+        # Highest index first so earlier indexes stay valid while deleting
+        for index, _ in sorted(ours, reverse=True):
+            requests.append({'deleteConditionalFormatRule': {'sheetId': sheet_id, 'index': index}})
+        for position, rule in enumerate(wanted):
+            requests.append({'addConditionalFormatRule': {'rule': rule, 'index': position}})
+
+    for validation in spec.get('validation', []):
+        if validation['column'] not in columns:
+            continue
+        rule = validation_rule(validation['values'])
+        samples = (validations or {}).get(validation['column'], [])
+        if samples and all(same_validation(current, rule) for current in samples):
+            continue
+        requests.append({'setDataValidation': {
+            'range': column_range(sheet_id, columns[validation['column']]),
+            'rule': rule,
+        }})
+    return requests
+
+def apply_spec(worksheet, spec):
+    """Bring `worksheet` in line with `spec`. Returns the number of requests sent (0 if unchanged)."""
+    header, last_row, existing = read_layout(worksheet)
+    columns = {name: index for index, name in enumerate(header) if name}
+
+    # The first and last data cell of each dropdown column tell whether it still covers the data
+    samples = {}
+    for validation in spec.get('validation', []):
+        if validation['column'] in columns:
+            letter = column_letter(columns[validation['column']])
+            samples[validation['column']] = [f"{letter}2", f"{letter}{max(last_row, 2)}"]
+    found = read_validations(worksheet, [cell for cells in samples.values() for cell in cells]) if samples else {}
+    validations = {column: [found.get(cell) for cell in cells] for column, cells in samples.items()}
+
+    requests = plan_requests(spec, worksheet.id, header, existing, validations)
+    if requests:
+        worksheet.spreadsheet.batch_update({'requests': requests})
+    return len(requests)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Local SQLite mirror of the lead spreadsheet's tabs.
+
+Syncing records the spreadsheet's Drive version with each mirrored tab and
+only re-pulls tabs when that version has moved, so a sync of an unchanged
+spreadsheet costs one Drive metadata request and no Sheets reads. Scripts run
+with --from-mirror then read rows from the local copy: selection and analysis
+work offline and in milliseconds, without spending Sheets read quota.
+
+Usage:
+    python execution/sheet_mirror.py                       # mirror every tab
+    python execution/sheet_mirror.py "Qualified Leads" --force
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from dotenv import load_dotenv
+from sheets_client import SPREADSHEET_ID, require_config, get_sheets, get_service
+from sheet_writer import execute_with_retry
+
+load_dotenv()
+
+MIRROR_PATH = os.getenv("SHEET_MIRROR_PATH", os.path.join(".cache", "sheet_mirror.sqlite"))
+READ_RANGE = "A:ZZ"
+
+def open_mirror(path=MIRROR_PATH):
+    """Open (creating if needed) the mirror database."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tabs (
+            spreadsheet_id TEXT NOT NULL,
+            sheet TEXT NOT NULL,
+            version TEXT NOT NULL,
+            modified_time TEXT,
+            header TEXT NOT NULL,
+            synced_at REAL NOT NULL,
+            PRIMARY KEY (spreadsheet_id, sheet)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rows (
+            spreadsheet_id TEXT NOT NULL,
+            sheet TEXT NOT NULL,
+            row_number INTEGER NOT NULL,
+            cells TEXT NOT NULL,
+            PRIMARY KEY (spreadsheet_id, sheet, row_number)
+        )
+    """)
+    return conn
+
+def drive_metadata(spreadsheet_id=SPREADSHEET_ID):
+    """Return (version, modifiedTime) of the spreadsheet file."""
+    result = execute_with_retry(get_service('drive', 'v3').files().get(
+        fileId=spreadsheet_id, fields='version,modifiedTime', supportsAllDrives=True))
+    return result.get('version'), result.get('modifiedTime')
+
+def list_tabs(sheet, spreadsheet_id=SPREADSHEET_ID):
+    result = execute_with_retry(sheet.get(spreadsheetId=spreadsheet_id, fields='sheets.properties.title'))
+    return [tab['properties']['title'] for tab in result.get('sheets', [])]
+
+def store_tab(conn, spreadsheet_id, sheet_name, values, version, modified_time):
+    """Replace the mirrored copy of one tab with freshly read `values`."""
+    header = values[0] if values else []
+    conn.execute("DELETE FROM rows WHERE spreadsheet_id = ? AND sheet = ?", (spreadsheet_id, sheet_name))
+    conn.executemany(
+        "INSERT INTO rows (spreadsheet_id, sheet, row_number, cells) VALUES (?, ?, ?, ?)",
+        [(spreadsheet_id, sheet_name, row_number, json.dumps(cells))
+         for row_number, cells in enumerate(values[1:], start=2) if any(cells)]
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO tabs (spreadsheet_id, sheet, version, modified_time, header, synced_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (spreadsheet_id, sheet_name, str(version), modified_time, json.dumps(header), time.time())
+    )
+    conn.commit()
+
+def sync_tabs(conn, tab_names=None, force=False, spreadsheet_id=SPREADSHEET_ID):
+    """Mirror `tab_names` (default: every tab), pulling only tabs whose version changed.
+
+    Returns the list of tabs that were re-pulled.
+    """
+    require_config()
+    sheet = get_sheets()
+    version, modified_time = drive_metadata(spreadsheet_id)
+    tab_names = tab_names or list_tabs(sheet, spreadsheet_id)
+
+    stale = []
+    for name in tab_names:
+        row = conn.execute(
+            "SELECT version FROM tabs WHERE spreadsheet_id = ? AND sheet = ?", (spreadsheet_id, name)
+        ).fetchone()
+        if force or not row or row[0] != str(version):
+            stale.append(name)
+
+    if not stale:
+        print(f"Mirror is current (version {version}, modified {modified_time})")
+        return []
+
+    # All stale tabs in one request
+    result = execute_with_retry(sheet.values().batchGet(
+        spreadsheetId=spreadsheet_id,
+        ranges=[f"'{name}'!{READ_RANGE}" for name in stale],
+    ))
+    for name, value_range in zip(stale, result.get('valueRanges', [])):
+        values = value_range.get('values', [])
+        store_tab(conn, spreadsheet_id, name, values, version, modified_time)
+        print(f"Mirrored '{name}': {max(len(values) - 1, 0)} rows")
+    return stale
+
+def read_header(conn, sheet_name, spreadsheet_id=SPREADSHEET_ID):
+    """Header row of a mirrored tab, or [] if it has never been mirrored."""
+    row = conn.execute(
+        "SELECT header FROM tabs WHERE spreadsheet_id = ? AND sheet = ?", (spreadsheet_id, sheet_name)
+    ).fetchone()
+    return json.loads(row[0]) if row else []
+
+def read_tab(conn, sheet_name, spreadsheet_id=SPREADSHEET_ID):
+    """Return (header, [(row_number, cells)]) for a mirrored tab.
+
+    Raises ValueError if the tab has never been mirrored.
+    """
+    tab = conn.execute(
+        "SELECT header, synced_at, modified_time FROM tabs WHERE spreadsheet_id = ? AND sheet = ?",
+        (spreadsheet_id, sheet_name)
+    ).fetchone()
+    if not tab:
+        raise ValueError(f"'{sheet_name}' is not mirrored yet. Run: python execution/sheet_mirror.py \"{sheet_name}\"")
+
+    header, synced_at, modified_time = tab
+    age_minutes = (time.time() - synced_at) / 60
+    print(f"Reading '{sheet_name}' from mirror (synced {age_minutes:.0f} min ago, sheet modified {modified_time})")
+    rows = conn.execute(
+        "SELECT row_number, cells FROM rows WHERE spreadsheet_id = ? AND sheet = ? ORDER BY row_number",
+        (spreadsheet_id, sheet_name)
+    )
+    return json.loads(header), [(row_number, json.loads(cells)) for row_number, cells in rows]
+
+def find_rows(conn, sheet_name, columns=None, predicate=None, limit=None):
+    """Mirror counterpart of sheet_reader.find_rows: row dicts with '_row_number'.
+
+    `columns` defaults to the whole header; duplicate header names resolve
+    to their last column, as dict(zip(header, row)) does.
+    """
+    header, rows = read_tab(conn, sheet_name)
+    positions = {name: index for index, name in enumerate(header)}
+    wanted = {name: positions[name] for name in (columns or header) if name in positions}
+
+    found = []
+    for row_number, cells in rows:
+        row = {name: (cells[index] if index < len(cells) else '') for name, index in wanted.items()}
+        row['_row_number'] = row_number
+        if predicate and not predicate(row):
+            continue
+        found.append(row)
+        if limit and len(found) >= limit:
+            break
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror Google Sheet tabs into a local SQLite store")
+    parser.add_argument("tabs", nargs="*", help="Tabs to mirror (default: every tab)")
+    parser.add_argument("--force", action="store_true", help="Re-pull even if the spreadsheet hasn't changed")
+
+    args = parser.parse_args()
+
+    try:
+        conn = open_mirror()
+        sync_tabs(conn, args.tabs, args.force)
+        conn.close()
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
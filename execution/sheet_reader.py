@@ -0,0 +1,95 @@
+"""
+Column-projected, windowed reads of a sheet tab.
+
+The enrichment scripts used to download every column of every row and then
+stop after a handful of leads. Here the header row is read once and the
+requested header names are resolved to column letters; only those columns are
+fetched (one values().batchGet per window, one range per run of adjacent
+columns), a window of rows at a time. Rows are yielded as they arrive, so a
+caller that breaks out after `limit` matches never fetches the rest of the tab.
+"""
+
+from sheet_sync import column_letter
+from range_planner import row_runs
+from sheet_writer import execute_with_retry
+
+FIRST_WINDOW = 200
+MAX_WINDOW = 5000
+
+def read_layout(sheet, spreadsheet_id, sheet_name):
+    """Return (header, row_count) for a tab in a single request."""
+    result = execute_with_retry(sheet.get(
+        spreadsheetId=spreadsheet_id,
+        ranges=[f"'{sheet_name}'!1:1"],
+        includeGridData=True,
+        fields="sheets(properties.gridProperties.rowCount,data.rowData.values.formattedValue)",
+    ))
+    tab = result['sheets'][0]
+    row_data = (tab.get('data') or [{}])[0].get('rowData') or [{}]
+    header = [cell.get('formattedValue', '') for cell in row_data[0].get('values', [])]
+    # Trailing blank header cells aren't columns
+    while header and not header[-1]:
+        header.pop()
+    return header, tab['properties']['gridProperties']['rowCount']
+
+def resolve_columns(header, columns):
+    """{name: column index} for the requested names present in `header`.
+
+    A name that appears more than once resolves to its last column, the same
+    column dict(zip(header, row)) would have picked.
+    """
+    positions = {name: index for index, name in enumerate(header)}
+    return {name: positions[name] for name in columns if name in positions}
+
+def iter_rows(sheet, spreadsheet_id, sheet_name, columns, layout=None):
+    """Yield {column: value, '_row_number': n} for each data row, reading only `columns`.
+
+    Columns missing from the tab come back as ''. Windows start small and
+    double up to MAX_WINDOW rows, so small limits are answered quickly and
+    full scans still use few requests.
+    """
+    header, row_count = layout or read_layout(sheet, spreadsheet_id, sheet_name)
+    resolved = resolve_columns(header, columns)
+    if not resolved:
+        return
+
+    runs = row_runs(sorted(set(resolved.values())))
+    start, window = 2, FIRST_WINDOW
+    while start <= row_count:
+        end = min(start + window - 1, row_count)
+        result = execute_with_retry(sheet.values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=[f"'{sheet_name}'!{column_letter(first)}{start}:{column_letter(last)}{end}" for first, last in runs],
+            majorDimension="ROWS",
+        ))
+
+        # {column index: [cells of each row in the window]} from the per-run blocks
+        cells = {}
+        for (first, last), value_range in zip(runs, result.get('valueRanges', [])):
+            block = value_range.get('values', [])
+            for column in range(first, last + 1):
+                cells[column] = [row[column - first] if column - first < len(row) else '' for row in block]
+
+        for offset in range(end - start + 1):
+            row = {name: (cells[column][offset] if offset < len(cells[column]) else '')
+                   for name, column in resolved.items()}
+            row['_row_number'] = start + offset
+            yield row
+
+        start, window = end + 1, min(window * 2, MAX_WINDOW)
+
+def find_rows(sheet, spreadsheet_id, sheet_name, columns, predicate=None, limit=None, layout=None):
+    """Rows (see iter_rows) matching `predicate`, stopping once `limit` are found.
+
+    Rows whose requested cells are all blank are skipped.
+    """
+    found = []
+    for row in iter_rows(sheet, spreadsheet_id, sheet_name, columns, layout):
+        if not any(value for key, value in row.items() if key != '_row_number'):
+            continue
+        if predicate and not predicate(row):
+            continue
+        found.append(row)
+        if limit and len(found) >= limit:
+            break
+    return found
@@ -0,0 +1,240 @@
+"""
+Incremental sync of lead rows into a Google Sheets tab.
+
+Instead of clearing the tab and rewriting every cell, the current tab is read
+once and each row is keyed by a stable id (place_id, website domain or phone).
+Rows match on the highest-priority id both of them have: two rows with
+place_ids are the same place only if the place_ids agree, so chain locations
+sharing a domain or phone stay separate; domain and phone only decide when a
+row has no place_id.
+Rows are compared by a hash of the columns this script manages, and only new
+or changed rows are sent, coalesced into a single values().batchUpdate.
+Columns the script does not manage (e.g. Outreach_Status) are never written,
+so manual edits survive, and rows that are no longer in the input are left as
+they are. Placeholder columns the source has no data for (insert_only) are
+laid out on new rows but never compared or overwritten afterwards.
+"""
+
+import re
+import hashlib
+
+from domains import normalize_domain
+
+READ_RANGE = "A1:ZZ"
+# Header names (case-insensitive) tried in order when keying a row
+DEFAULT_KEY_FIELDS = ('place_id', 'website', 'phone')
+NON_DIGIT_RE = re.compile(r'\D')
+
+def column_letter(index):
+    """0-based column index -> A1 column letters (0 -> A, 26 -> AA)."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def normalize_cell(value):
+    """Canonical string form of a cell so written and read-back values compare equal.
+
+    USER_ENTERED drops a leading apostrophe and turns numeric text into numbers
+    ("4.0" reads back as 4), so both are folded away before comparing.
+    """
+    if value is None:
+        return ''
+    text = str(value).strip()
+    if text.startswith("'"):
+        text = text[1:]
+    try:
+        return repr(float(text))
+    except ValueError:
+        return text
+
+def row_hash(cells):
+    return hashlib.sha1('\x1f'.join(normalize_cell(cell) for cell in cells).encode('utf-8')).hexdigest()
+
+def key_value(field, value):
+    """Normalized id for a key field, or None when the cell can't identify a row."""
+    value = normalize_cell(value)
+    if not value:
+        return None
+    if field == 'website':
+        value = normalize_domain(value)
+    elif field == 'phone':
+        value = NON_DIGIT_RE.sub('', value)
+    return f"{field}:{value.lower()}" if value else None
+
+def row_keys(cells, positions, key_fields):
+    """All ids a row can be matched by, in key_fields priority order."""
+    keys = []
+    for field in key_fields:
+        position = positions.get(field)
+        if position is not None and position < len(cells):
+            key = key_value(field, cells[position])
+            if key:
+                keys.append(key)
+    return keys
+
+def key_field(key):
+    return key.split(':', 1)[0]
+
+def find_match(keys, index):
+    """The existing row matching `keys` on the highest-priority id both rows have, or None.
+
+    `index` maps each id to [(row_number, cells, row keys)]. A lower-priority id
+    only counts when no higher-priority field is present on both sides.
+    """
+    ours = set()
+    for key in keys:
+        for row_number, cells, their_keys in index.get(key, []):
+            if not ours & {key_field(their_key) for their_key in their_keys}:
+                return row_number, cells
+        ours.add(key_field(key))
+    return None
+
+def contiguous_runs(positions):
+    """Split sorted column positions into (first, last) runs of adjacent columns."""
+    runs = []
+    for position in positions:
+        if runs and position == runs[-1][1] + 1:
+            runs[-1][1] = position
+        else:
+            runs.append([position, position])
+    return runs
+
+def unique_rows(header, rows, key_fields=DEFAULT_KEY_FIELDS):
+    """Drop input rows whose primary (highest-priority) id an earlier row already had."""
+    lookup = {name.strip().lower(): i for i, name in enumerate(header)}
+    positions = {field: lookup.get(field) for field in key_fields}
+    seen = set()
+    for row in rows:
+        keys = row_keys(row, positions, key_fields)
+        if keys and keys[0] in seen:
+            continue  # duplicate lead in the input
+        if keys:
+            seen.add(keys[0])
+        yield keys, row
+
+def plan_sync(existing, header, rows, key_fields=DEFAULT_KEY_FIELDS, insert_only=()):
+    """Work out which cells need writing to turn `existing` into `header` + `rows`.
+
+    `existing` is the tab as read (header row first). Columns named in
+    `insert_only` are written on new rows only, never compared or updated.
+    Returns (data, stats) where data is the list of ValueRanges (without
+    sheet prefix) for one batchUpdate and stats counts inserted, updated and
+    unchanged rows.
+    """
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    if not existing or not any(existing[0]):
+        # Empty tab: header plus everything in one block
+        rows = [row for _, row in unique_rows(header, rows, key_fields)]
+        end = column_letter(len(header) - 1)
+        stats['inserted'] = len(rows)
+        return [{'range': f"A1:{end}{len(rows) + 1}", 'values': [header] + rows}], stats
+
+    sheet_header = list(existing[0])
+    lookup = {str(name).strip().lower(): index for index, name in enumerate(sheet_header)}
+    data = []
+
+    # Managed columns missing from the tab are added after its last column
+    added = [name for name in header if name.strip().lower() not in lookup]
+    if added:
+        start = len(sheet_header)
+        data.append({
+            'range': f"{column_letter(start)}1:{column_letter(start + len(added) - 1)}1",
+            'values': [added],
+        })
+        for offset, name in enumerate(added):
+            lookup[name.strip().lower()] = start + offset
+
+    # Where each managed column lives in the tab
+    targets = [lookup[name.strip().lower()] for name in header]
+    positions = {field: lookup.get(field) for field in key_fields}
+
+    index = {}
+    for row_number, cells in enumerate(existing[1:], start=2):
+        keys = row_keys(cells, positions, key_fields)
+        for key in keys:
+            index.setdefault(key, []).append((row_number, cells, keys))
+
+    # Only these columns are compared and rewritten on existing rows
+    insert_only = {name.strip().lower() for name in insert_only}
+    compared = [i for i, name in enumerate(header) if name.strip().lower() not in insert_only]
+
+    changed = {}
+    inserts = []
+    for keys, row in unique_rows(header, rows, key_fields):
+        match = find_match(keys, index)
+        if match is None:
+            inserts.append(row)
+            continue
+
+        row_number, cells = match
+        current = [cells[targets[i]] if targets[i] < len(cells) else '' for i in compared]
+        if row_hash(current) == row_hash([row[i] for i in compared]):
+            stats['unchanged'] += 1
+        else:
+            changed[row_number] = row
+            stats['updated'] += 1
+
+    # Changed rows: one range per run of adjacent managed columns, merged across consecutive rows
+    order = sorted(compared, key=lambda i: targets[i])
+    runs = contiguous_runs([targets[i] for i in order])
+    row_numbers = sorted(changed)
+    blocks = []
+    for row_number in row_numbers:
+        if blocks and row_number == blocks[-1][-1] + 1:
+            blocks[-1].append(row_number)
+        else:
+            blocks.append([row_number])
+    for block in blocks:
+        for first, last in runs:
+            columns = [i for i in order if first <= targets[i] <= last]
+            data.append({
+                'range': f"{column_letter(first)}{block[0]}:{column_letter(last)}{block[-1]}",
+                'values': [[changed[row_number][i] for i in columns] for row_number in block],
+            })
+
+    # New rows go straight below the last used row, written as full rows
+    if inserts:
+        width = max(targets) + 1
+        start = len(existing) + 1
+        values = []
+        for row in inserts:
+            cells = [''] * width
+            for i, target in enumerate(targets):
+                cells[target] = row[i]
+            values.append(cells)
+        data.append({
+            'range': f"A{start}:{column_letter(width - 1)}{start + len(inserts) - 1}",
+            'values': values,
+        })
+        stats['inserted'] = len(inserts)
+
+    return data, stats
+
+def sync_sheet(sheet, spreadsheet_id, sheet_name, header, rows, key_fields=DEFAULT_KEY_FIELDS, insert_only=()):
+    """Sync `rows` into `sheet_name` with one read and at most one write.
+
+    Returns the stats from plan_sync plus the number of cells written.
+    """
+    result = sheet.values().get(
+        spreadsheetId=spreadsheet_id,
+        range=f"'{sheet_name}'!{READ_RANGE}",
+        valueRenderOption="UNFORMATTED_VALUE",
+    ).execute()
+
+    data, stats = plan_sync(result.get('values', []), header, rows, key_fields, insert_only)
+    stats['cells'] = 0
+    if not data:
+        return stats
+
+    for value_range in data:
+        value_range['range'] = f"'{sheet_name}'!{value_range['range']}"
+
+    response = sheet.values().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body={'valueInputOption': 'USER_ENTERED', 'data': data},
+    ).execute()
+    stats['cells'] = response.get('totalUpdatedCells', 0)
+    return stats
@@ -0,0 +1,224 @@
+"""
+Chunked, resumable bulk writer for Google Sheets.
+
+Sending a whole dump in one values().append call runs into request-size
+limits and per-minute write quotas, and a single failure loses everything.
+Here rows are read from an iterator and cut into chunks bounded by row count
+and encoded size as they arrive. Each chunk is written to an explicit range
+below the current data (so chunks can be in flight at the same time without
+reordering rows), and 429/5xx responses are retried with jittered
+exponential backoff. Only the chunks in flight are held in memory.
+
+The row offsets of acknowledged chunks are checkpointed under .cache/uploads,
+so an upload that still fails can be resumed with --resume: the rows are
+read again, and only the ones not yet acknowledged are sent, to the same
+sheet rows as before.
+"""
+
+import os
+import json
+import time
+import random
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from googleapiclient.errors import HttpError
+
+from sheets_client import new_http
+from sheet_sync import READ_RANGE
+
+CHECKPOINT_DIR = os.path.join(".cache", "uploads")
+CHUNK_ROWS = 2000
+# Well under the ~10MB request limit, leaving room for JSON overhead
+CHUNK_BYTES = 2_000_000
+DEFAULT_WORKERS = 4
+MAX_RETRIES = 6
+BASE_DELAY = 1.0
+MAX_DELAY = 64.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def checkpoint_path(input_file, sheet_name):
+    """Checkpoint location for uploading `input_file` to `sheet_name`."""
+    name = os.path.splitext(os.path.basename(input_file))[0]
+    tab = ''.join(c if c.isalnum() else '_' for c in sheet_name)
+    return os.path.join(CHECKPOINT_DIR, f"{name}.{tab}.json")
+
+def load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_checkpoint(path, checkpoint):
+    """Write the checkpoint atomically so a crash never leaves half a file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+def remove_checkpoint(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def add_span(spans, offset, count):
+    """Add [offset, offset + count) to sorted, merged [start, end] row spans."""
+    spans.append([offset, offset + count])
+    spans.sort()
+    merged = [spans[0]]
+    for start, end in spans[1:]:
+        if start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    spans[:] = merged
+
+def covered(spans, offset):
+    return any(start <= offset < end for start, end in spans)
+
+def iter_chunks(rows, skip=(), max_rows=CHUNK_ROWS, max_bytes=CHUNK_BYTES):
+    """Yield (offset, rows) chunks of consecutive rows, bounded by row count and encoded size.
+
+    Rows whose offset falls inside a `skip` span are left out (and end the chunk).
+    """
+    offset, chunk, size = 0, [], 0
+    for i, row in enumerate(rows):
+        if covered(skip, i):
+            if chunk:
+                yield offset, chunk
+            chunk, size = [], 0
+            continue
+        row_bytes = len(json.dumps(row))
+        if chunk and (len(chunk) >= max_rows or size + row_bytes > max_bytes):
+            yield offset, chunk
+            chunk, size = [], 0
+        if not chunk:
+            offset = i
+        chunk.append(row)
+        size += row_bytes
+    if chunk:
+        yield offset, chunk
+
+def is_retryable(error):
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRY_STATUSES
+    return isinstance(error, (socket.timeout, ConnectionError))
+
+def execute_with_retry(request, http=None, retries=MAX_RETRIES):
+    """Execute an API request, retrying quota and server errors with full-jitter backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return request.execute(http=http)
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+            status = getattr(getattr(e, 'resp', None), 'status', type(e).__name__)
+            print(f"  {status}, retrying in {delay:.1f}s (attempt {attempt + 1}/{retries})")
+            time.sleep(delay)
+
+def next_empty_row(sheet, spreadsheet_id, sheet_name):
+    """First row below the last used row in any column (1 for an empty tab).
+
+    Column A alone isn't enough: trailing rows with a blank first cell would
+    be written over.
+    """
+    result = execute_with_retry(sheet.values().get(
+        spreadsheetId=spreadsheet_id,
+        range=f"'{sheet_name}'!{READ_RANGE}",
+    ))
+    # Trailing empty rows are left out of the response, inner ones are not
+    return len(result.get('values', [])) + 1
+
+def write_rows(sheet, spreadsheet_id, sheet_name, rows, header=None, checkpoint=None, resume=False,
+               workers=DEFAULT_WORKERS, max_rows=CHUNK_ROWS, max_bytes=CHUNK_BYTES):
+    """Write `rows` (any iterable, read once) below the existing data in `sheet_name`.
+
+    `header` is written first only when the tab is empty. With a `checkpoint`
+    path, the row offsets of acknowledged chunks are recorded as they land;
+    with `resume`, a matching checkpoint is picked up and rows it already
+    covers are skipped. Returns {'rows', 'cells', 'chunks', 'seconds'} for
+    this run.
+    """
+    state = load_checkpoint(checkpoint) if resume else None
+    if state and (state.get('sheet') != sheet_name or 'acked_rows' not in state):
+        print("Checkpoint doesn't match this upload, starting over.")
+        state = None
+
+    if state:
+        done = sum(end - start for start, end in state['acked_rows'])
+        print(f"Resuming upload: {done} rows already written")
+    else:
+        start_row = next_empty_row(sheet, spreadsheet_id, sheet_name)
+        if header and start_row == 1:
+            execute_with_retry(sheet.values().update(
+                spreadsheetId=spreadsheet_id,
+                range=f"'{sheet_name}'!A1",
+                valueInputOption="USER_ENTERED",
+                body={'values': [header]},
+            ))
+            start_row = 2
+        state = {'sheet': sheet_name, 'start_row': start_row, 'acked_rows': []}
+    if checkpoint:
+        save_checkpoint(checkpoint, state)
+
+    local = threading.local()
+
+    def send(offset, chunk):
+        # Each worker thread keeps its own connection; httplib2 isn't thread-safe
+        if not hasattr(local, 'http'):
+            local.http = new_http()
+        request = sheet.values().update(
+            spreadsheetId=spreadsheet_id,
+            range=f"'{sheet_name}'!A{state['start_row'] + offset}",
+            valueInputOption="USER_ENTERED",
+            body={'values': chunk},
+        )
+        return execute_with_retry(request, http=local.http)
+
+    stats = {'rows': 0, 'cells': 0, 'chunks': 0}
+    started = time.time()
+    in_flight = {}
+    error = None
+
+    def collect(futures):
+        nonlocal error
+        for future in futures:
+            offset, count = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                # Stop reading, but keep recording chunks that are already in flight
+                error = error or e
+                continue
+
+            add_span(state['acked_rows'], offset, count)
+            if checkpoint:
+                save_checkpoint(checkpoint, state)
+
+            stats['rows'] += count
+            stats['cells'] += result.get('updatedCells', 0)
+            stats['chunks'] += 1
+            elapsed = time.time() - started
+            print(f"  chunk {stats['chunks']}: {stats['rows']} rows in {elapsed:.1f}s "
+                  f"({stats['rows'] / max(elapsed, 1e-6):.0f} rows/s)")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        skip = [list(span) for span in state['acked_rows']]
+        for offset, chunk in iter_chunks(rows, skip, max_rows, max_bytes):
+            # Bounded read-ahead: at most two chunks per worker are held in memory
+            while len(in_flight) >= workers * 2:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+            if error:
+                break
+            in_flight[pool.submit(send, offset, chunk)] = (offset, len(chunk))
+        while in_flight:
+            collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+
+    if error:
+        raise error
+
+    stats['seconds'] = time.time() - started
+    remove_checkpoint(checkpoint)
+    return stats
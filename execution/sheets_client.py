@@ -0,0 +1,76 @@
+"""
+Shared Google Sheets client for the execution scripts.
+
+The service-account file is parsed once per process, and the Sheets service
+(plus the gspread client used by filter_and_score) is built once on top of a
+single authorized HTTP connection pool. Repeated calls within a run reuse the
+same OAuth token and keep-alive connections instead of re-authenticating.
+Discovery comes from the document bundled with google-api-python-client
+(static_discovery), so building the service never goes to the network.
+"""
+
+import os
+from functools import lru_cache
+
+import httplib2
+import google_auth_httplib2
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
+CREDENTIALS_FILE = os.getenv("GOOGLE_SHEETS_CREDENTIALS_JSON")
+# Drive is needed by gspread and for reading spreadsheet revision metadata
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+HTTP_TIMEOUT = 60
+
+def require_config():
+    if not SPREADSHEET_ID or not CREDENTIALS_FILE:
+        raise ValueError("GOOGLE_SPREADSHEET_ID or GOOGLE_SHEETS_CREDENTIALS_JSON not set in .env")
+
+@lru_cache(maxsize=None)
+def get_credentials():
+    """Service-account credentials, loaded once per process."""
+    require_config()
+    return service_account.Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
+
+def new_http():
+    """A fresh authorized connection on the shared credentials.
+
+    httplib2 connections are not thread-safe: threads that send requests
+    concurrently each need their own (pass it to request.execute(http=...)).
+    """
+    return google_auth_httplib2.AuthorizedHttp(get_credentials(), http=httplib2.Http(timeout=HTTP_TIMEOUT))
+
+@lru_cache(maxsize=None)
+def get_service(api='sheets', version='v4'):
+    """A discovery-based API client sharing the process-wide credentials and connection pool."""
+    return build(api, version, http=new_http(), static_discovery=True, cache_discovery=False)
+
+def get_sheets():
+    """The spreadsheets() resource of the shared Sheets service."""
+    return get_service('sheets', 'v4').spreadsheets()
+
+def get_revision(spreadsheet_id=None):
+    """Drive version of the spreadsheet; it increases with every change to any tab.
+
+    Returns None if Drive can't be asked (API not enabled, no access, quota),
+    so callers fall back to reading the sheet instead of failing.
+    """
+    try:
+        result = get_service('drive', 'v3').files().get(
+            fileId=spreadsheet_id or SPREADSHEET_ID, fields='version', supportsAllDrives=True).execute()
+    except HttpError as e:
+        print(f"Drive revision unavailable ({e.resp.status}), skipping the revision check")
+        return None
+    return result.get('version')
+
+@lru_cache(maxsize=None)
+def get_gspread_client():
+    """A gspread client on the shared credentials (gspread pools connections in its own session)."""
+    # Imported here so scripts that only use the Sheets API don't pay for gspread
+    import gspread
+    return gspread.authorize(get_credentials())
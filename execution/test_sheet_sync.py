@@ -0,0 +1,45 @@
+"""Matching rules of sheet_sync.plan_sync. Run with: python -m pytest execution"""
+
+from sheet_sync import plan_sync
+
+HEADER = ['name', 'website', 'phone', 'place_id']
+CHAIN = 'https://www.brightviewseniorliving.com'
+
+def test_chain_locations_sharing_a_domain_stay_separate():
+    existing = [HEADER, ['Brightview A', f'{CHAIN}/a', '555-0100', 'p1']]
+    rows = [['Brightview B', f'{CHAIN}/b', '555-0100', 'p2']]
+
+    data, stats = plan_sync(existing, HEADER, rows)
+
+    assert stats == {'inserted': 1, 'updated': 0, 'unchanged': 0}
+    assert data == [{'range': 'A3:D3', 'values': rows}]
+
+def test_chain_locations_are_not_dropped_on_first_sync():
+    rows = [
+        ['Brightview A', f'{CHAIN}/a', '555-0100', 'p1'],
+        ['Brightview B', f'{CHAIN}/b', '555-0100', 'p2'],
+        ['Brightview C', f'{CHAIN}/c', '555-0100', 'p3'],
+        ['Brightview A', f'{CHAIN}/a', '555-0100', 'p1'],
+    ]
+
+    data, stats = plan_sync([], HEADER, rows)
+
+    assert stats['inserted'] == 3
+    assert data[0]['values'] == [HEADER] + rows[:3]
+
+def test_same_place_id_updates_in_place():
+    existing = [HEADER, ['Old name', f'{CHAIN}/a', '555-0100', 'p1']]
+    rows = [['New name', f'{CHAIN}/a', '555-0100', 'p1']]
+
+    data, stats = plan_sync(existing, HEADER, rows)
+
+    assert stats['updated'] == 1
+    assert data == [{'range': 'A2:D2', 'values': rows}]
+
+def test_domain_decides_when_a_row_has_no_place_id():
+    existing = [HEADER, ['Sunrise', 'sunrise.com', '', '']]
+    rows = [['Sunrise', 'https://www.sunrise.com/', '', 'p9']]
+
+    _, stats = plan_sync(existing, HEADER, rows)
+
+    assert stats['updated'] == 1